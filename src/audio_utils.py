@@ -2,9 +2,31 @@
 Audio utilities for duration detection.
 """
 
-import subprocess
-import json
 from pathlib import Path
+from typing import Dict, List
+
+from src.probe_cache import get_duration, get_durations
+
+
+def probe_durations(paths: List[Path]) -> Dict[Path, float]:
+    """
+    Get durations for many media files at once.
+
+    Args:
+        paths: Paths to audio or video files
+
+    Returns:
+        Dict mapping each path to its duration in seconds
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails for any file
+        ValueError: If any file has an invalid or zero/negative duration
+
+    Example:
+        durations = probe_durations([Path("a.mp3"), Path("b.mp3")])
+        # Returns: {Path("a.mp3"): 30.5, Path("b.mp3"): 12.0}
+    """
+    return get_durations(paths)
 
 
 def get_audio_duration(audio_path: Path) -> float:
@@ -25,28 +47,7 @@ def get_audio_duration(audio_path: Path) -> float:
         duration = get_audio_duration(Path("audio.mp3"))
         # Returns: 30.5
     """
-    cmd = [
-        'ffprobe',
-        '-v', 'quiet',
-        '-print_format', 'json',
-        '-show_format',
-        str(audio_path)
-    ]
-
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        check=True
-    )
-
-    data = json.loads(result.stdout)
-    duration = float(data['format']['duration'])
-
-    if duration <= 0:
-        raise ValueError(f"Invalid duration: {duration}")
-
-    return duration
+    return get_duration(audio_path)
 
 
 def verify_audio_file(audio_path: Path) -> bool:
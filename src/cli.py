@@ -7,7 +7,9 @@ import sys
 import subprocess
 from pathlib import Path
 
+from src.encoder_probe import ENCODER_ARGS, INTERMEDIATE_EXTENSIONS
 from src.pipeline import run_pipeline
+from src.utils import require_ffmpeg
 
 
 def parse_args() -> argparse.Namespace:
@@ -81,8 +83,9 @@ Examples:
         '--audio-transition-mode',
         type=str,
         default='gap',
-        choices=['gap', 'crossfade', 'none'],
-        help='Audio transition between clips: gap (silence), crossfade, or none (default: gap)'
+        choices=['gap', 'crossfade', 'flat_afade', 'none'],
+        help='Audio transition between clips: gap (silence), crossfade, '
+             'flat_afade (crossfade as one flat graph), or none (default: gap)'
     )
 
     parser.add_argument(
@@ -99,6 +102,38 @@ Examples:
         help='Number of parallel workers (default: CPU count)'
     )
 
+    parser.add_argument(
+        '--encoder',
+        type=str,
+        default='auto',
+        choices=['auto'] + list(ENCODER_ARGS),
+        help='H.264 encoder; auto uses a hardware encoder when available, '
+             'falling back to libx264 (default: auto)'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed for Ken Burns positions and transitions (default: random)'
+    )
+
+    parser.add_argument(
+        '--two-pass',
+        action='store_true',
+        help='Encode each pair to an intermediate clip in parallel, then concatenate '
+             '(default: render everything in a single FFmpeg pass)'
+    )
+
+    parser.add_argument(
+        '--intermediate-codec',
+        type=str,
+        default='prores',
+        choices=list(INTERMEDIATE_EXTENSIONS),
+        help='Codec for --two-pass intermediate clips: prores, ffv1 or h264 '
+             '(default: prores; h264 is always used for stream-copy joins)'
+    )
+
     parser.add_argument(
         '--temp-dir',
         type=Path,
@@ -123,6 +158,8 @@ def main() -> int:
         print("🎬 Video Automation CLI")
         print("=" * 60)
 
+        require_ffmpeg()
+
         output_path = run_pipeline(
             images_dir=args.images,
             audio_dir=args.audio,
@@ -134,7 +171,11 @@ def main() -> int:
             max_workers=args.workers,
             temp_dir=args.temp_dir,
             audio_transition_mode=args.audio_transition_mode,
-            audio_gap_duration=args.audio_gap_duration
+            audio_gap_duration=args.audio_gap_duration,
+            single_pass=not args.two_pass,
+            encoder=args.encoder,
+            seed=args.seed,
+            intermediate_codec=args.intermediate_codec
         )
 
         print("\n" + "=" * 60)
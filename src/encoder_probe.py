@@ -0,0 +1,242 @@
+"""
+H.264 encoder selection: hardware encoders when available, libx264 otherwise.
+"""
+
+import functools
+import subprocess
+from typing import List, Optional, Tuple
+
+from src.utils import FFMPEG
+
+
+# Tried in order; the first one that actually works on this machine wins
+ENCODER_PREFERENCE = [
+    'h264_nvenc',         # NVIDIA
+    'h264_videotoolbox',  # macOS
+    'h264_qsv',           # Intel Quick Sync
+    'h264_vaapi',         # Linux VA-API (Intel/AMD)
+    'libx264',            # Software fallback
+]
+
+# Rate control / pixel format settings roughly matching libx264 -crf 23
+ENCODER_ARGS = {
+    'h264_nvenc': ['-preset', 'p4', '-tune', 'hq', '-rc', 'vbr', '-cq', '23', '-b:v', '0', '-pix_fmt', 'yuv420p'],
+    'h264_videotoolbox': ['-q:v', '50', '-pix_fmt', 'yuv420p'],
+    'h264_qsv': ['-global_quality', '23', '-pix_fmt', 'nv12'],
+    'h264_vaapi': ['-rc_mode', 'CQP', '-qp', '23'],
+    'libx264': ['-preset', 'fast', '-crf', '23', '-pix_fmt', 'yuv420p'],
+}
+
+# DRM render node used for VA-API encoding
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
+# Encoders that only accept frames in GPU memory: (device options placed
+# before the inputs, filter appended to the end of the software graph).
+# Filters such as zoompan and xfade have no hardware variant, so the graph
+# stays on the CPU and frames are uploaded only at the encoder boundary.
+HW_UPLOAD = {
+    'h264_vaapi': (['-vaapi_device', VAAPI_DEVICE], 'format=nv12,hwupload'),
+}
+
+# Intra-only mezzanine codecs for two-pass intermediate clips. They skip
+# motion search and entropy-heavy coding, so the first pass is cheap and
+# the concat re-encode starts from near-lossless input.
+INTERMEDIATE_CODEC_ARGS = {
+    'prores': ['-c:v', 'prores_ks', '-profile:v', '1', '-pix_fmt', 'yuv422p10le'],
+    'ffv1': ['-c:v', 'ffv1', '-level', '3', '-slices', '16', '-pix_fmt', 'yuv420p'],
+}
+
+# Container for each intermediate codec ('h264' = the delivery encoder)
+INTERMEDIATE_EXTENSIONS = {
+    'h264': '.mp4',
+    'prores': '.mov',
+    'ffv1': '.mkv',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def available_encoders() -> Tuple[str, ...]:
+    """
+    List the encoders compiled into the local FFmpeg build (cached per process).
+
+    Returns:
+        Tuple of encoder names, empty if FFmpeg cannot be run
+    """
+    try:
+        result = subprocess.run(
+            [FFMPEG, '-hide_banner', '-encoders'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ()
+
+    names = []
+    for line in result.stdout.splitlines():
+        # Encoder lines look like: " V....D libx264   libx264 H.264 / AVC ..."
+        parts = line.split()
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            names.append(parts[1])
+    return tuple(names)
+
+
+@functools.lru_cache(maxsize=None)
+def encoder_works(encoder: str) -> bool:
+    """
+    Check that an encoder can really encode a frame (cached per process).
+
+    Hardware encoders are often compiled in even when no matching GPU or
+    driver is present, so being listed by -encoders is not enough.
+
+    Args:
+        encoder: FFmpeg encoder name
+
+    Returns:
+        True if a one-frame test encode succeeds
+    """
+    device_args, upload = HW_UPLOAD.get(encoder, ([], None))
+    upload_args = ['-vf', upload] if upload else []
+
+    cmd = [
+        FFMPEG,
+        '-hide_banner',
+        '-loglevel', 'error',
+    ] + device_args + [
+        '-f', 'lavfi',
+        '-i', 'color=black:s=256x256:d=0.1',
+        '-frames:v', '1',
+    ] + upload_args + [
+        '-c:v', encoder,
+    ] + ENCODER_ARGS[encoder] + [
+        '-f', 'null',
+        '-'
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+
+def select_encoder() -> str:
+    """
+    Pick the preferred working H.264 encoder.
+
+    Returns:
+        Encoder name, 'libx264' if no hardware encoder is usable
+
+    Example:
+        encoder = select_encoder()
+        # Returns: 'h264_nvenc' on a machine with an NVIDIA GPU
+    """
+    available = available_encoders()
+    for encoder in ENCODER_PREFERENCE:
+        if encoder == 'libx264':
+            break
+        if encoder in available and encoder_works(encoder):
+            return encoder
+    return 'libx264'
+
+
+def resolve_encoder(encoder: str = 'auto') -> str:
+    """
+    Turn an encoder setting into a concrete encoder name.
+
+    Args:
+        encoder: 'auto' or one of ENCODER_ARGS
+
+    Returns:
+        Encoder name
+
+    Raises:
+        ValueError: If encoder is not supported
+    """
+    if encoder == 'auto':
+        return select_encoder()
+    if encoder not in ENCODER_ARGS:
+        raise ValueError(f"Unsupported encoder: {encoder}")
+    return encoder
+
+
+def encoder_args(encoder: str = 'auto') -> List[str]:
+    """
+    Build the FFmpeg video codec arguments for an encoder.
+
+    Args:
+        encoder: 'auto' or one of ENCODER_ARGS
+
+    Returns:
+        List of FFmpeg arguments starting with -c:v
+
+    Raises:
+        ValueError: If encoder is not supported
+
+    Example:
+        encoder_args('libx264')
+        # Returns: ['-c:v', 'libx264', '-preset', 'fast', '-crf', '23', '-pix_fmt', 'yuv420p']
+    """
+    encoder = resolve_encoder(encoder)
+    return ['-c:v', encoder] + ENCODER_ARGS[encoder]
+
+
+def hw_device_args(encoder: str = 'auto') -> List[str]:
+    """
+    Build the global FFmpeg options that open an encoder's hardware device.
+
+    Args:
+        encoder: 'auto' or one of ENCODER_ARGS
+
+    Returns:
+        Options to place before the inputs (empty for most encoders)
+
+    Raises:
+        ValueError: If encoder is not supported
+    """
+    return list(HW_UPLOAD.get(resolve_encoder(encoder), ([], None))[0])
+
+
+def hw_upload_filter(encoder: str = 'auto') -> Optional[str]:
+    """
+    Get the filter that moves software frames to an encoder's hardware device.
+
+    Args:
+        encoder: 'auto' or one of ENCODER_ARGS
+
+    Returns:
+        Filter to append after the last software filter, or None if the
+        encoder takes frames from system memory
+
+    Raises:
+        ValueError: If encoder is not supported
+
+    Example:
+        hw_upload_filter('h264_vaapi')
+        # Returns: 'format=nv12,hwupload'
+    """
+    return HW_UPLOAD.get(resolve_encoder(encoder), ([], None))[1]
+
+
+def intermediate_args(codec: str = 'h264', encoder: str = 'auto') -> List[str]:
+    """
+    Build the FFmpeg video codec arguments for an intermediate clip.
+
+    Args:
+        codec: 'h264' (use the delivery encoder) or one of INTERMEDIATE_CODEC_ARGS
+        encoder: H.264 encoder used when codec is 'h264'
+
+    Returns:
+        List of FFmpeg arguments starting with -c:v
+
+    Raises:
+        ValueError: If codec or encoder is not supported
+
+    Example:
+        intermediate_args('prores')
+        # Returns: ['-c:v', 'prores_ks', '-profile:v', '1', '-pix_fmt', 'yuv422p10le']
+    """
+    if codec == 'h264':
+        return encoder_args(encoder)
+    if codec not in INTERMEDIATE_CODEC_ARGS:
+        raise ValueError(f"Unsupported intermediate codec: {codec}")
+    return list(INTERMEDIATE_CODEC_ARGS[codec])
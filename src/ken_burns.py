@@ -2,12 +2,13 @@
 Ken Burns effect generator for creating dynamic video from static images.
 """
 
-import subprocess
 from pathlib import Path
 import random
 from typing import Tuple
 
 from src.audio_utils import get_audio_duration
+from src.encoder_probe import hw_device_args, hw_upload_filter, intermediate_args
+from src.utils import FFMPEG, FFMPEG_LOG_ARGS, run_ffmpeg
 
 
 # Random position regions
@@ -23,11 +24,35 @@ POSITION_REGIONS = [
     "right_center",     # Right edge center
 ]
 
-
-def calculate_random_position() -> Tuple[str, str]:
+# (x_expression, y_expression) for the zoompan filter, in POSITION_REGIONS order
+_POS_EXPRS = (
+    ("'iw/2-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'"),              # center
+    ("'iw/20-(iw/zoom/2)'", "'ih/20-(ih/zoom/2)'"),            # top_left
+    ("'iw-(iw/20)-(iw/zoom/2)'", "'ih/20-(ih/zoom/2)'"),       # top_right
+    ("'iw/20-(iw/zoom/2)'", "'ih-(ih/20)-(ih/zoom/2)'"),       # bottom_left
+    ("'iw-(iw/20)-(iw/zoom/2)'", "'ih-(ih/20)-(ih/zoom/2)'"),  # bottom_right
+    ("'iw/2-(iw/zoom/2)'", "'ih/15-(ih/zoom/2)'"),             # top_center
+    ("'iw/2-(iw/zoom/2)'", "'ih-(ih/15)-(ih/zoom/2)'"),        # bottom_center
+    ("'iw/15-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'"),             # left_center
+    ("'iw-(iw/15)-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'"),        # right_center
+)
+
+# Lookup by region name for callers that pass an explicit position
+_POSITION_EXPRS = dict(zip(POSITION_REGIONS, _POS_EXPRS))
+
+# zoompan works at this multiple of the output size, then the result is
+# downscaled; enough headroom to hide zoompan's integer-rounding jitter
+# without blowing the source up 10x. Raise to 3 if jitter becomes visible.
+ZOOM_PRECISION = 2
+
+
+def calculate_random_position(rng: random.Random = None) -> Tuple[str, str]:
     """
     Calculate random starting position for zoom.
 
+    Args:
+        rng: Random generator to draw from (default: module-level random)
+
     Returns:
         Tuple of (x_expression, y_expression) for FFmpeg zoompan filter
 
@@ -35,52 +60,85 @@ def calculate_random_position() -> Tuple[str, str]:
         x_expr, y_expr = calculate_random_position()
         # Returns: ("'iw/2-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'") for center
     """
-    region = random.choice(POSITION_REGIONS)
-
-    if region == "center":
-        x_expr = "'iw/2-(iw/zoom/2)'"
-        y_expr = "'ih/2-(ih/zoom/2)'"
-    elif region == "top_left":
-        x_expr = "'iw/20-(iw/zoom/2)'"
-        y_expr = "'ih/20-(ih/zoom/2)'"
-    elif region == "top_right":
-        x_expr = "'iw-(iw/20)-(iw/zoom/2)'"
-        y_expr = "'ih/20-(ih/zoom/2)'"
-    elif region == "bottom_left":
-        x_expr = "'iw/20-(iw/zoom/2)'"
-        y_expr = "'ih-(ih/20)-(ih/zoom/2)'"
-    elif region == "bottom_right":
-        x_expr = "'iw-(iw/20)-(iw/zoom/2)'"
-        y_expr = "'ih-(ih/20)-(ih/zoom/2)'"
-    elif region == "top_center":
-        x_expr = "'iw/2-(iw/zoom/2)'"
-        y_expr = "'ih/15-(ih/zoom/2)'"
-    elif region == "bottom_center":
-        x_expr = "'iw/2-(iw/zoom/2)'"
-        y_expr = "'ih-(ih/15)-(ih/zoom/2)'"
-    elif region == "left_center":
-        x_expr = "'iw/15-(iw/zoom/2)'"
-        y_expr = "'ih/2-(ih/zoom/2)'"
-    elif region == "right_center":
-        x_expr = "'iw-(iw/15)-(iw/zoom/2)'"
-        y_expr = "'ih/2-(ih/zoom/2)'"
+    return _POS_EXPRS[(rng or random).randrange(len(_POS_EXPRS))]
+
+
+def build_zoompan_filter(
+    total_frames: int,
+    width: int = 1920,
+    height: int = 1080,
+    fps: int = 30,
+    start_zoom: float = 1.15,
+    end_zoom: float = 1.0,
+    position: str = None,
+    pix_fmt: str = 'yuv420p'
+) -> str:
+    """
+    Build the Ken Burns zoompan filter for a single still image.
+
+    Args:
+        total_frames: Number of output frames to generate
+        width: Output width (default 1920)
+        height: Output height (default 1080)
+        fps: Frame rate (default 30)
+        start_zoom: Starting zoom level (default 1.15 = 15% zoom)
+        end_zoom: Ending zoom level (default 1.0)
+        position: Starting region from POSITION_REGIONS (None = random)
+        pix_fmt: Pixel format of the output frames (default yuv420p); pass
+            the encoder's own format so frames are converted only once
+
+    Returns:
+        FFmpeg filter string (scale + zoompan + scale) zooming out from the
+        given (or a random) position, producing pix_fmt frames at width x height
+
+    Example:
+        vf = build_zoompan_filter(total_frames=900)
+        # Returns: "scale=-2:ih*2:flags=lanczos,zoompan=...:s=3840x2160:fps=30,scale=1920:1080:..."
+    """
+    # Calculate zoom increment per frame
+    zoom_increment = (start_zoom - end_zoom) / total_frames
+
+    # Get starting position
+    if position is None:
+        x_expr, y_expr = calculate_random_position()
     else:
-        # Default to center
-        x_expr = "'iw/2-(iw/zoom/2)'"
-        y_expr = "'ih/2-(ih/zoom/2)'"
+        x_expr, y_expr = _POSITION_EXPRS[position]
 
-    return x_expr, y_expr
+    # Build zoompan filter
+    # 1. Pre-scale by ZOOM_PRECISION for sub-pixel headroom
+    # 2. Apply zoompan with zoom out at ZOOM_PRECISION x output size
+    # 3. Smooth easing: start zoomed, gradually zoom out
+    # 4. Downscale to the output size
+    return (
+        f"scale=-2:ih*{ZOOM_PRECISION}:flags=lanczos,"
+        f"zoompan="
+        f"z='if(eq(on,1),{start_zoom},max(zoom-{zoom_increment},{end_zoom}))':"
+        f"x={x_expr}:"
+        f"y={y_expr}:"
+        f"d={total_frames}:"
+        f"s={width * ZOOM_PRECISION}x{height * ZOOM_PRECISION}:"
+        f"fps={fps},"
+        f"scale={width}:{height}:flags=lanczos,"
+        f"format={pix_fmt}"
+    )
 
 
 def create_ken_burns_video(
     image_path: Path,
     audio_path: Path,
     output_path: Path,
+    *,
+    duration: float = None,
     width: int = 1920,
     height: int = 1080,
     fps: int = 30,
     start_zoom: float = 1.15,
-    end_zoom: float = 1.0
+    end_zoom: float = 1.0,
+    threads: int = 0,
+    encoder: str = 'auto',
+    position: str = None,
+    codec: str = 'h264',
+    include_audio: bool = True
 ) -> Path:
     """
     Create a Ken Burns zoom-out video from image with duration matching audio.
@@ -89,11 +147,20 @@ def create_ken_burns_video(
         image_path: Path to input image
         audio_path: Path to audio file (for duration)
         output_path: Path for output video
+        duration: Clip duration in seconds, normally pre-probed by the caller;
+            falls back to probing audio_path if None
         width: Output width (default 1920)
         height: Output height (default 1080)
         fps: Frame rate (default 30)
         start_zoom: Starting zoom level (default 1.15 = 15% zoom)
         end_zoom: Ending zoom level (default 1.0)
+        threads: FFmpeg encoder and filter threads (default 0 = let FFmpeg decide)
+        encoder: H.264 encoder name, or 'auto' to pick hardware if available
+        position: Starting region from POSITION_REGIONS (None = random)
+        codec: 'h264' to encode with encoder, or an intra-only intermediate
+            codec ('prores', 'ffv1') when the clip will be re-encoded anyway
+        include_audio: Mux audio_path into the clip (default True). Pass False
+            for a silent clip when the concat reads the original audio itself.
 
     Returns:
         Path to output video
@@ -106,54 +173,61 @@ def create_ken_burns_video(
         video_path = create_ken_burns_video(
             image_path=Path("photo.jpg"),
             audio_path=Path("narration.mp3"),
-            output_path=Path("output.mp4")
+            output_path=Path("output.mp4"),
+            duration=30.5
         )
     """
-    # Get duration from audio
-    duration = get_audio_duration(audio_path)
+    # Get duration from audio unless the caller already probed it
+    if duration is None:
+        duration = get_audio_duration(audio_path)
+    if duration <= 0:
+        raise ValueError(f"Invalid duration: {duration}")
     total_frames = int(fps * duration)
 
-    # Calculate zoom increment per frame
-    zoom_increment = (start_zoom - end_zoom) / total_frames
-
-    # Get random position
-    x_expr, y_expr = calculate_random_position()
+    # Finish the filter in the codec's own pixel format, so a 10-bit 4:2:2
+    # ProRes intermediate is not squeezed through 8-bit 4:2:0 first
+    codec_args = intermediate_args(codec, encoder)
+    pix_fmt = 'yuv420p'
+    if '-pix_fmt' in codec_args:
+        pix_fmt = codec_args[codec_args.index('-pix_fmt') + 1]
 
-    # Build zoompan filter
-    # 1. Pre-scale to 10x height for smoothness
-    # 2. Apply zoompan with zoom out
-    # 3. Smooth easing: start zoomed, gradually zoom out
-    zoompan_filter = (
-        f"scale=-2:ih*10,"
-        f"zoompan="
-        f"z='if(eq(on,1),{start_zoom},max(zoom-{zoom_increment},{end_zoom}))':"
-        f"x={x_expr}:"
-        f"y={y_expr}:"
-        f"d={total_frames}:"
-        f"s={width}x{height}:"
-        f"fps={fps}"
+    zoompan_filter = build_zoompan_filter(
+        total_frames, width, height, fps, start_zoom, end_zoom, position,
+        pix_fmt=pix_fmt
     )
 
+    # GPU-memory encoders get the finished frames uploaded after zoompan
+    device_args = []
+    if codec == 'h264':
+        device_args = hw_device_args(encoder)
+        upload = hw_upload_filter(encoder)
+        if upload:
+            zoompan_filter = f"{zoompan_filter},{upload}"
+
+    # Silent clips skip decoding and re-encoding the audio entirely;
+    # -t and -vframes already fix the clip length
+    audio_input = ['-i', str(audio_path)] if include_audio else []
+    audio_output = ['-c:a', 'aac', '-shortest'] if include_audio else ['-an']
+
     # Build FFmpeg command
     cmd = [
-        'ffmpeg',
+        FFMPEG,
+        *FFMPEG_LOG_ARGS,
         '-y',  # Overwrite output file
+        '-filter_threads', str(threads),
+    ] + device_args + [
         '-r', str(fps),
         '-loop', '1',
         '-t', str(duration),
         '-i', str(image_path),
-        '-i', str(audio_path),  # Add audio input
+    ] + audio_input + [
         '-vf', zoompan_filter,
         '-vframes', str(total_frames),
-        '-c:v', 'libx264',
-        '-pix_fmt', 'yuv420p',
-        '-preset', 'fast',
-        '-crf', '23',
-        '-c:a', 'aac',
-        '-shortest',  # Match audio duration
+    ] + codec_args + audio_output + [
+        '-threads', str(threads),
         str(output_path)
     ]
 
-    subprocess.run(cmd, check=True, capture_output=True)
+    run_ffmpeg(cmd)
 
     return output_path
@@ -3,17 +3,49 @@ Main pipeline orchestration for video automation.
 """
 
 import os
+import random
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Tuple
-from concurrent.futures import ProcessPoolExecutor, as_completed
-
-from src.ken_burns import create_ken_burns_video
-from src.video_concat import concatenate_videos_with_transitions
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from src.audio_utils import probe_durations
+from src.encoder_probe import INTERMEDIATE_EXTENSIONS, resolve_encoder
+from src.ken_burns import POSITION_REGIONS, create_ken_burns_video
+from src.single_pass import MAX_SINGLE_PASS_PAIRS, render_single_pass
+from src.transitions import get_random_transition
+from src.video_concat import concatenate_videos_with_transitions, stream_copy_concat
 from src.utils import temp_dir_context, ensure_directory
 
 
+# Pattern: image_###.ext or audio_###.ext
+_IMAGE_RE = re.compile(r'^image_(\d+)\.(jpg|jpeg|png|heic)$', re.IGNORECASE)
+_AUDIO_RE = re.compile(r'^audio_(\d+)\.(mp3|wav|m4a|ogg|aac)$', re.IGNORECASE)
+
+
+def _scan_directory(
+    directory: Path,
+    patterns: List[Tuple[re.Pattern, Dict[int, Path]]]
+) -> None:
+    """
+    Collect indexed files from a directory into the matching pattern's dict.
+
+    os.scandir yields the file type from readdir, so regular files need no
+    extra stat() call (symlinks are still followed, as with Path.is_file).
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            for pattern, found in patterns:
+                match = pattern.match(entry.name)
+                if match:
+                    found[int(match.group(1))] = Path(entry.path)
+                    break
+
+
 def discover_and_pair_files(
     images_dir: Path,
     audio_dir: Path
@@ -40,27 +72,16 @@ def discover_and_pair_files(
         )
         # Returns: [(Path("images/image_001.jpg"), Path("audio/audio_001.mp3"), 1), ...]
     """
-    # Pattern: image_###.ext or audio_###.ext
-    image_pattern = re.compile(r'^image_(\d+)\.(jpg|jpeg|png|heic)$', re.IGNORECASE)
-    audio_pattern = re.compile(r'^audio_(\d+)\.(mp3|wav|m4a|ogg|aac)$', re.IGNORECASE)
-
     # Find all matching files
     images = {}
     audio_files = {}
 
-    for img_path in images_dir.iterdir():
-        if img_path.is_file():
-            match = image_pattern.match(img_path.name)
-            if match:
-                index = int(match.group(1))
-                images[index] = img_path
-
-    for audio_path in audio_dir.iterdir():
-        if audio_path.is_file():
-            match = audio_pattern.match(audio_path.name)
-            if match:
-                index = int(match.group(1))
-                audio_files[index] = audio_path
+    if Path(images_dir).resolve() == Path(audio_dir).resolve():
+        # Shared directory: walk it once and dispatch on the pattern
+        _scan_directory(images_dir, [(_IMAGE_RE, images), (_AUDIO_RE, audio_files)])
+    else:
+        _scan_directory(images_dir, [(_IMAGE_RE, images)])
+        _scan_directory(audio_dir, [(_AUDIO_RE, audio_files)])
 
     # Verify we have matching pairs
     all_indices = sorted(set(images.keys()) | set(audio_files.keys()))
@@ -88,12 +109,13 @@ def discover_and_pair_files(
     return pairs
 
 
-def process_single_pair(args: Tuple[Path, Path, Path]) -> Path:
+def process_single_pair(args: Tuple[Path, Path, Path, float], **options) -> Path:
     """
     Process a single image/audio pair - designed for parallel execution.
 
     Args:
-        args: Tuple of (image_path, audio_path, temp_output_path)
+        args: Tuple of (image_path, audio_path, temp_output_path, duration)
+        **options: Extra keyword arguments for create_ken_burns_video
 
     Returns:
         Path to generated video
@@ -102,11 +124,14 @@ def process_single_pair(args: Tuple[Path, Path, Path]) -> Path:
         video_path = process_single_pair((
             Path("image.jpg"),
             Path("audio.mp3"),
-            Path("output.mp4")
-        ))
+            Path("output.mp4"),
+            30.5
+        ), threads=2)
     """
-    image_path, audio_path, temp_output = args
-    return create_ken_burns_video(image_path, audio_path, temp_output)
+    image_path, audio_path, temp_output, duration = args
+    return create_ken_burns_video(
+        image_path, audio_path, temp_output, duration=duration, **options
+    )
 
 
 def run_pipeline(
@@ -120,7 +145,11 @@ def run_pipeline(
     max_workers: int = None,
     temp_dir: Path = None,
     audio_transition_mode: str = 'gap',
-    audio_gap_duration: float = 0.5
+    audio_gap_duration: float = 0.5,
+    single_pass: bool = True,
+    encoder: str = 'auto',
+    seed: int = None,
+    intermediate_codec: str = 'prores'
 ) -> Path:
     """
     Run complete video automation pipeline.
@@ -135,8 +164,22 @@ def run_pipeline(
         transition_duration: Duration of transitions (default 1.0s)
         max_workers: Max parallel workers (default: os.cpu_count())
         temp_dir: Temporary directory for intermediate files (auto-created if None)
-        audio_transition_mode: Audio transition mode: 'gap', 'crossfade', or 'none' (default 'gap')
+        audio_transition_mode: Audio transition mode: 'gap', 'crossfade',
+            'flat_afade', or 'none' (default 'gap'). 'flat_afade' is the
+            crossfade timeline built as one flat graph; long crossfade
+            slideshows use it automatically.
         audio_gap_duration: Duration of silence gap in seconds for gap mode (default 0.5)
+        single_pass: Render everything in one FFmpeg invocation (default True).
+            If False, or with more than MAX_SINGLE_PASS_PAIRS pairs, encode
+            one intermediate clip per pair in parallel and concatenate them
+            afterwards.
+        encoder: H.264 encoder name, or 'auto' to use a hardware encoder when
+            one is available (default 'auto')
+        seed: Seed for Ken Burns positions and transitions, for reproducible
+            output (default None = random each run)
+        intermediate_codec: Codec for two-pass intermediate clips that are
+            re-encoded by the transition concat: 'prores', 'ffv1' or 'h264'
+            (default 'prores'). Clips joined by stream copy always use H.264.
 
     Returns:
         Path to final output video
@@ -167,6 +210,49 @@ def run_pipeline(
     pairs = discover_and_pair_files(images_dir, audio_dir)
     print(f"✅ Found {len(pairs)} image/audio pairs")
 
+    # Probe all audio durations up front so workers never spawn ffprobe
+    durations = probe_durations([audio_path for _, audio_path, _ in pairs])
+
+    # Resolve once so every clip is encoded with identical settings
+    encoder = resolve_encoder(encoder)
+    print(f"🎛️  Using video encoder: {encoder}")
+
+    # Draw every random choice up front so workers never touch the RNG
+    rng = random.Random(seed)
+    positions = [rng.choice(POSITION_REGIONS) for _ in pairs]
+    transitions = [get_random_transition(rng=rng) for _ in range(len(pairs) - 1)]
+
+    if single_pass and len(pairs) > MAX_SINGLE_PASS_PAIRS:
+        # One graph holding every input would need too much memory and too
+        # many open files; encode clips in worker batches instead
+        print(f"ℹ️  {len(pairs)} pairs exceed the single-pass limit of "
+              f"{MAX_SINGLE_PASS_PAIRS}, using two-pass rendering")
+        single_pass = False
+
+    if single_pass:
+        # One encode for the whole slideshow, no intermediate files
+        print(f"🎞️  Rendering {len(pairs)} pairs in a single FFmpeg pass...")
+        final_video = render_single_pass(
+            image_paths=[image_path for image_path, _, _ in pairs],
+            audio_paths=[audio_path for _, audio_path, _ in pairs],
+            durations=[durations[audio_path] for _, audio_path, _ in pairs],
+            output_path=output_path,
+            width=width,
+            height=height,
+            fps=fps,
+            transition_duration=transition_duration,
+            use_random_transitions=True,
+            audio_transition_mode=audio_transition_mode,
+            audio_gap_duration=audio_gap_duration,
+            encoder=encoder,
+            positions=positions,
+            transitions=transitions,
+            temp_dir=ensure_directory(temp_dir) if temp_dir is not None else None
+        )
+
+        print(f"✨ Final video created: {output_path}")
+        return final_video
+
     # Setup temp directory
     if temp_dir is None:
         temp_context = temp_dir_context()
@@ -179,37 +265,78 @@ def run_pipeline(
 
     try:
         # Process pairs in parallel
+        # Each worker thread just waits on an ffmpeg process, so split the
+        # cores between them instead of letting every ffmpeg grab them all
         max_workers = max_workers or os.cpu_count()
+        per_worker_threads = max(1, (os.cpu_count() or 1) // max_workers)
         print(f"🚀 Processing {len(pairs)} pairs with {max_workers} workers...")
 
-        temp_videos = []
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Without transitions the clips are only remuxed, so start the concat
+        # now and hand it each clip once it and every clip before it is done
+        stream_concat = transition_duration <= 0 and audio_transition_mode == 'none'
+        concat_context = stream_copy_concat(output_path) if stream_concat else nullcontext()
+
+        # Remuxed clips end up in the output as-is and must be H.264 with
+        # audio; clips that get re-encoded only need to be fast to write and
+        # decode, and the concat mixes the original audio files itself
+        if intermediate_codec not in INTERMEDIATE_EXTENSIONS:
+            raise ValueError(f"Unsupported intermediate codec: {intermediate_codec}")
+        clip_codec = 'h264' if stream_concat else intermediate_codec
+        clip_extension = INTERMEDIATE_EXTENSIONS[clip_codec]
+
+        temp_videos: List[Optional[Path]] = [None] * len(pairs)
+        with concat_context as add_clip, ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all jobs
             futures = {}
             for i, (image_path, audio_path, index) in enumerate(pairs):
-                temp_output = temp_dir / f"pair_{index:03d}.mp4"
+                temp_output = temp_dir / f"pair_{index:03d}{clip_extension}"
                 future = executor.submit(
                     process_single_pair,
-                    (image_path, audio_path, temp_output)
+                    (image_path, audio_path, temp_output, durations[audio_path]),
+                    width=width,
+                    height=height,
+                    fps=fps,
+                    threads=per_worker_threads,
+                    encoder=encoder,
+                    position=positions[i],
+                    codec=clip_codec,
+                    include_audio=stream_concat
                 )
-                futures[future] = index
+                futures[future] = i
 
             # Collect results
-            for i, future in enumerate(as_completed(futures)):
-                index = futures[future]
+            next_pos = 0
+            for completed, future in enumerate(as_completed(futures), 1):
+                pos = futures[future]
+                index = pairs[pos][2]
                 try:
-                    temp_video = future.result()
-                    temp_videos.append((temp_video, index))
-                    print(f"  ✓ Completed pair {index:03d} ({i+1}/{len(pairs)})")
+                    temp_videos[pos] = future.result()
+                    print(f"  ✓ Completed pair {index:03d} ({completed}/{len(pairs)})")
                 except Exception as e:
                     print(f"  ✗ Failed pair {index:03d}: {e}")
                     raise
 
-        # Sort by index
-        temp_videos.sort(key=lambda x: x[1])
-        video_paths = [tv[0] for tv in temp_videos]
+                if add_clip is not None:
+                    # Out-of-order completions wait in their slot until their turn
+                    while next_pos < len(pairs) and temp_videos[next_pos] is not None:
+                        add_clip(temp_videos[next_pos])
+                        next_pos += 1
+
+        if stream_concat:
+            print(f"✨ Final video created: {output_path}")
+            return output_path
+
+        # Slots were filled by position in pairs, which is already index order
+        video_paths = temp_videos
+
+        # Each clip is exactly int(fps * duration) frames long (-vframes), so
+        # the concat needs no ffprobe round trip to place its xfade offsets
+        clip_durations = [
+            int(fps * durations[audio_path]) / fps for _, audio_path, _ in pairs
+        ]
 
-        # Concatenate with transitions
+        # Concatenate with transitions; the workers are done by now, so the
+        # concat keeps FFmpeg's default of using every core
         print(f"🎞️  Concatenating {len(video_paths)} videos with transitions...")
         final_video = concatenate_videos_with_transitions(
             video_paths=video_paths,
@@ -217,7 +344,12 @@ def run_pipeline(
             transition_duration=transition_duration,
             use_random_transitions=True,
             audio_transition_mode=audio_transition_mode,
-            audio_gap_duration=audio_gap_duration
+            audio_gap_duration=audio_gap_duration,
+            temp_dir=temp_dir,
+            encoder=encoder,
+            transitions=transitions,
+            audio_paths=[audio_path for _, audio_path, _ in pairs],
+            durations=clip_durations
         )
 
         print(f"✨ Final video created: {output_path}")
@@ -0,0 +1,287 @@
+"""
+Persistent on-disk cache for ffprobe duration lookups.
+"""
+
+import os
+import sqlite3
+import stat
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.probe_worker import probe_duration
+from src.utils import FFPROBE
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+
+# SQLite table "abs_path:size:mtime_ns" -> duration (a plain REAL, never
+# unpickled), kept across runs in a private per-user cache directory
+CACHE_PATH = (
+    Path(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'))
+    / 'video-automation' / 'probe.sqlite3'
+)
+
+# Per-process LRU layer in front of the database so repeat lookups skip the
+# disk; bounded so long-lived processes probing many files stay small
+MEMORY_CACHE_SIZE = 4096
+_memory_cache: 'OrderedDict[str, float]' = OrderedDict()
+_thread_lock = threading.Lock()
+
+
+def _cache_key(path: Path) -> Optional[str]:
+    """
+    Build the cache key for a file, or None if it cannot be stat'ed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _remember(key: str, duration: float) -> None:
+    """
+    Store a duration in the in-memory LRU, evicting the oldest entries.
+
+    Callers must hold _thread_lock.
+    """
+    _memory_cache[key] = duration
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+def _probe_one(path: Path) -> float:
+    """
+    Probe a single file's container duration.
+
+    Asks a persistent PyAV worker first and spawns ffprobe only if that
+    is unavailable or fails, so ffprobe's errors are what callers see.
+    """
+    try:
+        duration = probe_duration(path)
+    except Exception:
+        # The worker is only a shortcut; ffprobe gives the real answer/error
+        duration = None
+    if duration is not None:
+        return duration
+    return _ffprobe_duration(path)
+
+
+def _ffprobe_duration(path: Path) -> float:
+    """
+    Run ffprobe on a single file and return its container duration.
+    """
+    cmd = [
+        FFPROBE,
+        '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'csv=p=0',  # Bare value and newline, nothing to parse around it
+        str(path)
+    ]
+
+    # float() parses ASCII bytes itself, so stdout is never decoded to str
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        check=True
+    )
+
+    output = result.stdout.strip()
+    try:
+        duration = float(output)
+    except ValueError:
+        raise ValueError(f"Invalid duration for {path}: {output!r}")
+
+    if duration <= 0:
+        raise ValueError(f"Invalid duration: {duration}")
+
+    return duration
+
+
+def _probe_many(paths: List[Path]) -> Dict[Path, float]:
+    """
+    Probe several files, running ffprobe processes concurrently.
+
+    Each probe is dominated by process spawn and I/O wait, so a thread pool
+    is enough (the GIL is released inside subprocess.run).
+    """
+    if not paths:
+        return {}
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(paths, executor.map(_probe_one, paths)))
+
+
+def _private_cache_dir() -> Path:
+    """
+    Create the cache directory (mode 0700) and check nobody else controls it.
+
+    Raises:
+        PermissionError: If the directory is owned by another user or is
+            writable by group/others
+    """
+    cache_dir = CACHE_PATH.parent
+    cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = os.stat(cache_dir)
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        raise PermissionError(f"Probe cache directory {cache_dir} is owned by another user")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Probe cache directory {cache_dir} is writable by other users")
+    return cache_dir
+
+
+def _open_cache(stack: ExitStack) -> Optional[sqlite3.Connection]:
+    """
+    Lock and open the cache database, registering the cleanup on stack.
+
+    Returns None if the directory, lockfile or database is unusable.
+    """
+    try:
+        _private_cache_dir()
+        lock_file = stack.enter_context(
+            open(CACHE_PATH.with_name(CACHE_PATH.name + ".lock"), 'a')
+        )
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            stack.callback(fcntl.flock, lock_file, fcntl.LOCK_UN)
+        conn = sqlite3.connect(str(CACHE_PATH))
+        stack.callback(conn.close)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS durations (key TEXT PRIMARY KEY, duration REAL NOT NULL)"
+        )
+    except (OSError, sqlite3.Error):
+        return None
+    return conn
+
+
+@contextmanager
+def _locked_cache():
+    """
+    Open the cache database while holding an exclusive lock on a lockfile.
+
+    Holding the lock across the probe keeps concurrent pipelines from
+    probing the same file at the same time. Yields None if the cache
+    cannot be used (e.g. an unwritable or foreign-owned directory), in
+    which case results are only cached in memory.
+    """
+    with _thread_lock, ExitStack() as stack:
+        yield _open_cache(stack)
+
+
+def _read_cached(cache: sqlite3.Connection, keys: List[str]) -> Dict[str, float]:
+    """
+    Look up stored durations for the given keys; unknown keys are left out.
+    """
+    found = {}
+    try:
+        for key in keys:
+            row = cache.execute(
+                "SELECT duration FROM durations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                found[key] = float(row[0])
+    except sqlite3.Error:
+        pass
+    return found
+
+
+def _store_cached(cache: sqlite3.Connection, entries: Dict[str, float]) -> None:
+    """
+    Store durations in one transaction; failures only cost a future re-probe.
+    """
+    try:
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO durations (key, duration) VALUES (?, ?)",
+                entries.items()
+            )
+    except sqlite3.Error:
+        pass
+
+
+def get_durations(paths: List[Path]) -> Dict[Path, float]:
+    """
+    Get durations for many files, probing only those not already cached.
+
+    Args:
+        paths: Paths to audio or video files
+
+    Returns:
+        Dict mapping each path to its duration in seconds
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails for any file
+        ValueError: If any file has an invalid or zero/negative duration
+    """
+    paths = list(dict.fromkeys(Path(p) for p in paths))
+    keys = {path: _cache_key(path) for path in paths}
+
+    results = {}
+    with _thread_lock:
+        for path, key in keys.items():
+            if key is not None and key in _memory_cache:
+                _memory_cache.move_to_end(key)
+                results[path] = _memory_cache[key]
+
+    missing = [path for path in paths if path not in results]
+    if not missing:
+        return results
+
+    with _locked_cache() as cache:
+        stored = {}
+        if cache is not None:
+            stored = _read_cached(cache, [keys[p] for p in missing if keys[p] is not None])
+
+        to_probe = []
+        for path in missing:
+            key = keys[path]
+            if key in stored:
+                results[path] = stored[key]
+                _remember(key, results[path])
+            else:
+                to_probe.append(path)
+
+        new_entries = {}
+        for path, duration in _probe_many(to_probe).items():
+            key = keys[path]
+            if key is not None:
+                _remember(key, duration)
+                new_entries[key] = duration
+            results[path] = duration
+
+        if cache is not None and new_entries:
+            _store_cached(cache, new_entries)
+
+    return results
+
+
+def get_duration(path: Path) -> float:
+    """
+    Get the duration of a single file through the cache.
+
+    Args:
+        path: Path to audio or video file
+
+    Returns:
+        Duration in seconds as float
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails
+        ValueError: If the duration is invalid
+
+    Example:
+        duration = get_duration(Path("audio.mp3"))
+        # Returns: 30.5 (from cache on subsequent runs)
+    """
+    path = Path(path)
+    return get_durations([path])[path]
@@ -0,0 +1,158 @@
+"""
+Persistent PyAV probe workers: long-lived processes answer duration queries.
+
+Spawning ffprobe costs an exec, dynamic linking and codec registration on
+every call. When PyAV is installed, a small pool of worker processes pays
+those once and then probes each file in about a millisecond, several files
+at a time. Without PyAV (or if the workers fail) callers fall back to
+ffprobe.
+
+Workers are started with the 'spawn' method, which re-imports the calling
+script's __main__ module in each worker. Scripts that probe at import time
+must keep that code under ``if __name__ == '__main__':``; if a worker dies
+before answering its first query, no more are started and every probe goes
+to ffprobe instead.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import av
+except ImportError:  # Optional dependency: callers fall back to ffprobe
+    av = None
+
+
+# Workers kept alive at once; callers probe from a thread pool, so a few
+# workers keep several probes in flight
+POOL_SIZE = min(4, os.cpu_count() or 1)
+
+# Idle (process, connection) pairs, started on first use
+_idle: List[tuple] = []
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(POOL_SIZE)
+
+# Set once spawning is known not to work here (e.g. an unguarded __main__)
+_spawn_failed = False
+
+
+def _serve(conn) -> None:
+    """
+    Worker loop: receive path strings, reply with (duration, error).
+
+    A None path (or the parent closing its end) stops the worker.
+    """
+    while True:
+        try:
+            path = conn.recv()
+        except EOFError:
+            break
+        if path is None:
+            break
+
+        try:
+            with av.open(path, metadata_errors='ignore') as container:
+                duration = container.duration
+            if duration is None:
+                conn.send((None, "no container duration"))
+            else:
+                conn.send((duration / av.time_base, None))
+        except Exception as e:
+            conn.send((None, f"{type(e).__name__}: {e}"))
+
+    conn.close()
+
+
+def _start_worker():
+    """
+    Start a worker process and return (process, connection).
+    """
+    # spawn, not fork: the parent runs thread pools, which fork does not copy
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe()
+    process = ctx.Process(target=_serve, args=(child_conn,), daemon=True)
+    process.start()
+    child_conn.close()
+    return process, parent_conn
+
+
+def _stop_worker(worker) -> None:
+    """
+    Ask a worker to exit and release its connection.
+    """
+    process, conn = worker
+    try:
+        conn.send(None)
+    except OSError:
+        pass
+    conn.close()
+    if process is not None:
+        process.join(timeout=5)
+
+
+def shutdown_worker() -> None:
+    """
+    Stop every idle worker process.
+    """
+    with _pool_lock:
+        workers = _idle[:]
+        _idle.clear()
+    for worker in workers:
+        _stop_worker(worker)
+
+
+atexit.register(shutdown_worker)
+
+
+def probe_duration(path: Path) -> Optional[float]:
+    """
+    Get a file's container duration from a persistent PyAV worker.
+
+    Safe to call from many threads: up to POOL_SIZE probes run at once,
+    each on its own worker.
+
+    Args:
+        path: Path to audio or video file
+
+    Returns:
+        Duration in seconds, or None if PyAV is not installed, the file
+        could not be probed, or no worker could serve it (use ffprobe instead)
+
+    Example:
+        duration = probe_duration(Path("audio.mp3"))
+        # Returns: 30.5, or None without PyAV
+    """
+    global _spawn_failed
+    if av is None or _spawn_failed:
+        return None
+
+    with _slots:
+        with _pool_lock:
+            worker = _idle.pop() if _idle else None
+        fresh = worker is None
+
+        try:
+            if fresh:
+                worker = _start_worker()
+            _, conn = worker
+            conn.send(str(path))
+            duration, error = conn.recv()
+        except (OSError, EOFError, RuntimeError):
+            # A worker that dies before its first answer means spawning
+            # itself is broken here; stop trying and let ffprobe handle it
+            if fresh:
+                _spawn_failed = True
+            if worker is not None:
+                _stop_worker(worker)
+            return None
+
+        with _pool_lock:
+            _idle.append(worker)
+
+    if error is not None or duration <= 0:
+        return None
+    return duration
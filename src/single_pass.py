@@ -0,0 +1,156 @@
+"""
+Single-pass slideshow rendering: Ken Burns, transitions and audio in one FFmpeg run.
+"""
+
+from itertools import chain
+from pathlib import Path
+from typing import List
+
+from src.encoder_probe import encoder_args, hw_device_args, hw_upload_filter
+from src.ken_burns import build_zoompan_filter
+from src.video_concat import build_video_concat_filter, check_transition_fits
+from src.utils import FFMPEG, FFMPEG_LOG_ARGS, filter_script, run_ffmpeg
+
+
+# Every image and audio file is an input of the one graph, so FFmpeg's
+# memory and open file count grow with the pair count; run_pipeline takes
+# the two-pass path above this many pairs
+MAX_SINGLE_PASS_PAIRS = 64
+
+
+def render_single_pass(
+    image_paths: List[Path],
+    audio_paths: List[Path],
+    durations: List[float],
+    output_path: Path,
+    width: int = 1920,
+    height: int = 1080,
+    fps: int = 30,
+    transition_duration: float = 1.0,
+    transition_type: str = None,
+    use_random_transitions: bool = True,
+    excluded_transitions: List[str] = None,
+    audio_transition_mode: str = 'gap',
+    audio_gap_duration: float = 0.5,
+    encoder: str = 'auto',
+    positions: List[str] = None,
+    transitions: List[str] = None,
+    threads: int = 0,
+    temp_dir: Path = None
+) -> Path:
+    """
+    Render the whole slideshow with a single FFmpeg invocation.
+
+    Each image is zoompanned, the resulting streams are chained with xfade and
+    the audio graph from build_audio_filters is mixed in, so every pixel is
+    encoded exactly once and no intermediate clips are written.
+
+    All 2N inputs are open at once in one graph, so memory use and file
+    descriptors grow linearly with N; see MAX_SINGLE_PASS_PAIRS.
+
+    Args:
+        image_paths: Image file paths in order
+        audio_paths: Audio file paths in order (one per image)
+        durations: Audio duration in seconds for each pair
+        output_path: Path for final output video
+        width: Output width (default 1920)
+        height: Output height (default 1080)
+        fps: Frame rate (default 30)
+        transition_duration: Duration of each transition (default 1.0s)
+        transition_type: Specific transition to use (None = random)
+        use_random_transitions: Use different transition for each segment
+        excluded_transitions: Transitions to exclude from random selection
+        audio_transition_mode: Audio transition mode: 'gap', 'crossfade',
+            'flat_afade', or 'none' (default 'gap')
+        audio_gap_duration: Duration of silence gap in seconds for gap mode (default 0.5)
+        encoder: H.264 encoder name, or 'auto' to pick hardware if available
+        positions: Ken Burns starting region per image (None = random)
+        transitions: Pre-chosen transition for each junction (overrides random choice)
+        threads: FFmpeg encoder and filter graph threads (default 0 = let FFmpeg decide)
+        temp_dir: Directory for the filter script file (default: system temp dir)
+
+    Returns:
+        Path to output video
+
+    Raises:
+        ValueError: If less than 2 pairs provided, inputs are mismatched, or
+            a clip is too short for its transitions
+        subprocess.CalledProcessError: If FFmpeg fails
+
+    Example:
+        final_video = render_single_pass(
+            image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+            audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3")],
+            durations=[12.0, 8.5],
+            output_path=Path("final.mp4")
+        )
+    """
+    num_pairs = len(image_paths)
+    if num_pairs < 2:
+        raise ValueError("At least 2 videos required for concatenation with transitions")
+    if len(audio_paths) != num_pairs or len(durations) != num_pairs:
+        raise ValueError("image_paths, audio_paths and durations must have the same length")
+
+    # Inputs: all images first (0..N-1), then all audio (N..2N-1).
+    # Each image is read as a single frame; zoompan emits d frames from it,
+    # so the still is decoded once rather than once per output frame.
+    # xfade offsets must match the frames zoompan actually produces
+    frame_counts = [int(fps * duration) for duration in durations]
+    clip_durations = [frames / fps for frames in frame_counts]
+    check_transition_fits(image_paths, clip_durations, transition_duration)
+
+    video_filters = []
+    for i, total_frames in enumerate(frame_counts):
+        zoompan_filter = build_zoompan_filter(
+            total_frames, width, height, fps,
+            position=positions[i] if positions else None
+        )
+        video_filters.append(
+            f"[{i}:v]{zoompan_filter},setsar=1[kb{i}]"
+        )
+
+    # GPU-memory encoders: upload once, after the last software filter
+    concat_graph, video_label, final_audio_label = build_video_concat_filter(
+        clip_durations,
+        transition_duration=transition_duration,
+        transition_type=transition_type,
+        use_random_transitions=use_random_transitions,
+        excluded_transitions=excluded_transitions,
+        audio_transition_mode=audio_transition_mode,
+        audio_gap_duration=audio_gap_duration,
+        first_audio_input=num_pairs,
+        input_labels=[f"[kb{i}]" for i in range(num_pairs)],
+        transitions=transitions,
+        upload_filter=hw_upload_filter(encoder),
+        audio_durations=durations
+    )
+
+    filter_complex = ";".join(video_filters + [concat_graph])
+
+    input_args = [
+        arg
+        for path in chain(image_paths, audio_paths)
+        for arg in ('-i', str(path))
+    ]
+
+    # One zoompan + xfade + audio chain per pair quickly outgrows ARG_MAX
+    with filter_script(filter_complex, temp_dir) as script_path:
+        cmd = [
+            FFMPEG,
+            *FFMPEG_LOG_ARGS,
+            '-y',
+            '-filter_complex_threads', str(threads),
+        ] + hw_device_args(encoder) + input_args + [
+            '-filter_complex_script', str(script_path),
+            '-map', video_label,
+            '-map', final_audio_label,
+        ] + encoder_args(encoder) + [
+            '-c:a', 'aac',
+            '-threads', str(threads),
+            '-movflags', '+faststart',
+            str(output_path)
+        ]
+
+        run_ffmpeg(cmd)
+
+    return output_path
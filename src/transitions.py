@@ -27,12 +27,13 @@ TRANSITION_TYPES = [
 ]
 
 
-def get_random_transition(exclude: List[str] = None) -> str:
+def get_random_transition(exclude: List[str] = None, rng: random.Random = None) -> str:
     """
     Get a random transition type.
 
     Args:
         exclude: List of transitions to exclude from random selection
+        rng: Random generator to draw from (default: module-level random)
 
     Returns:
         Transition type string
@@ -54,7 +55,7 @@ def get_random_transition(exclude: List[str] = None) -> str:
     if not available:
         raise ValueError("No transitions available after exclusions")
 
-    return random.choice(available)
+    return (rng or random).choice(available)
 
 
 def validate_transition(transition: str) -> bool:
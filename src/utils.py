@@ -2,11 +2,22 @@
 Common utilities for video automation.
 """
 
+import os
+import subprocess
 import tempfile
 import shutil
 from pathlib import Path
-from typing import List
-from contextlib import contextmanager
+from typing import Iterator, List
+from contextlib import contextmanager, suppress
+
+
+# Resolve the FFmpeg binaries once instead of walking $PATH on every exec
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
+FFPROBE = shutil.which('ffprobe') or 'ffprobe'
+
+# Placed right after FFMPEG in every command: no progress line or banner
+# chatter on stderr, so the pipe only ever carries actual errors
+FFMPEG_LOG_ARGS = ['-nostats', '-loglevel', 'error']
 
 
 @contextmanager
@@ -33,20 +44,59 @@ def temp_dir_context():
 
 def create_temp_filename(base_name: str, suffix: str) -> Path:
     """
-    Create a temporary filename with proper extension.
+    Create a temporary file with proper extension and return its path.
+
+    The file is created atomically (empty), so the name cannot be claimed
+    by another process in between. The caller is responsible for deleting
+    it, e.g. with cleanup_temp_files().
 
     Args:
         base_name: Base name for the file
         suffix: File suffix/extension (e.g., ".mp4")
 
     Returns:
-        Path: Path to temporary filename
+        Path: Path to the new, empty temporary file
 
     Example:
         temp_path = create_temp_filename("output", ".mp4")
         # Returns something like: /tmp/output_XYz123.mp4
     """
-    return Path(tempfile.mktemp(prefix=f"{base_name}_", suffix=suffix))
+    temp_file = tempfile.NamedTemporaryFile(
+        prefix=f"{base_name}_", suffix=suffix, delete=False
+    )
+    temp_file.close()
+    return Path(temp_file.name)
+
+
+@contextmanager
+def filter_script(filter_complex: str, temp_dir: Path = None) -> Iterator[Path]:
+    """
+    Write a filter graph to a file for FFmpeg's -filter_complex_script.
+
+    Graphs for long slideshows can exceed the kernel's per-argument and
+    total argv limits, so they are passed by file instead of on the
+    command line. The file is removed when the context exits.
+
+    Args:
+        filter_complex: Filter graph description
+        temp_dir: Directory for the script file (default: system temp dir)
+
+    Yields:
+        Path: Path to the script file
+
+    Example:
+        with filter_script("[0:v][1:v]xfade=...[v0]") as script_path:
+            run_ffmpeg([FFMPEG, ..., '-filter_complex_script', str(script_path), ...])
+    """
+    with tempfile.NamedTemporaryFile(
+        'w', prefix='filter_', suffix='.txt', dir=temp_dir, delete=False
+    ) as script_file:
+        script_file.write(filter_complex)
+    try:
+        yield Path(script_file.name)
+    finally:
+        with suppress(FileNotFoundError):
+            os.unlink(script_file.name)
 
 
 def ensure_directory(directory: Path) -> Path:
@@ -75,5 +125,49 @@ def cleanup_temp_files(files: List[Path]) -> None:
         cleanup_temp_files([Path("/tmp/file1.mp4"), Path("/tmp/file2.mp4")])
     """
     for file in files:
-        if file.exists():
-            file.unlink()
+        # One unlink() instead of exists() + unlink(), and no TOCTOU window
+        with suppress(FileNotFoundError):
+            os.unlink(file)
+
+
+def require_ffmpeg() -> None:
+    """
+    Check that ffmpeg and ffprobe are installed.
+
+    Raises:
+        FileNotFoundError: If either binary is not on PATH
+    """
+    for name in ('ffmpeg', 'ffprobe'):
+        if shutil.which(name) is None:
+            raise FileNotFoundError(f"{name} not found on PATH")
+
+
+def run_ffmpeg(cmd: List[str]) -> None:
+    """
+    Run an FFmpeg command, keeping stderr only for error reporting.
+
+    stdout is discarded and stderr is read through a large buffer.
+    Commands built with FFMPEG_LOG_ARGS only write errors there, so the
+    captured output stays small however long the encode runs.
+    communicate() keeps draining the pipe while FFmpeg runs, which avoids
+    blocking on a full pipe buffer.
+
+    Args:
+        cmd: Command line to execute
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg exits non-zero (stderr attached)
+
+    Example:
+        run_ffmpeg([FFMPEG, *FFMPEG_LOG_ARGS, '-y', '-i', 'in.mp4', 'out.mp4'])
+    """
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        bufsize=1 << 20
+    ) as proc:
+        _, stderr = proc.communicate()
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
@@ -2,70 +2,141 @@
 Video concatenation with smooth transitions using FFmpeg xfade filter.
 """
 
+import functools
+import os
 import subprocess
-import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import accumulate, chain
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from src.encoder_probe import encoder_args, hw_device_args, hw_upload_filter
+from src.probe_cache import get_duration, get_durations
 from src.transitions import get_random_transition
+from src.utils import FFMPEG, FFMPEG_LOG_ARGS, FFPROBE, filter_script, run_ffmpeg
+
+try:
+    import orjson as _json  # Optional: C parser, takes bytes directly
+except ImportError:
+    import json as _json
+
+
+# From this many clips on, 'crossfade' audio is built as a flat afade/amix
+# graph instead of a chain of acrossfades that each wait on the previous one
+FLAT_AFADE_MIN_INPUTS = 10
 
 
 def build_audio_filters(
     num_videos: int,
     audio_transition_mode: str = 'gap',
     transition_duration: float = 1.0,
-    audio_gap_duration: float = 0.5
+    audio_gap_duration: float = 0.5,
+    first_input: int = 0,
+    durations: List[float] = None,
+    stream_copy: bool = False
 ) -> List[str]:
     """
     Build audio filter chain based on transition mode.
 
+    'flat_afade' sounds like 'crossfade' but builds a flat graph: every clip
+    is faded and delayed to its start time independently and a single amix
+    sums them, instead of N-1 acrossfades that each wait on the previous one.
+
     Args:
         num_videos: Number of video/audio inputs
-        audio_transition_mode: 'gap', 'crossfade', or 'none'
-        transition_duration: Duration for crossfade (used only in crossfade mode)
+        audio_transition_mode: 'gap', 'crossfade', 'flat_afade', or 'none'
+        transition_duration: Duration for crossfade (crossfade/flat_afade modes)
         audio_gap_duration: Duration of silence gap (used only in gap mode)
+        first_input: FFmpeg input index of the first audio stream (default 0)
+        durations: Duration of each audio stream in seconds (required for
+            flat_afade mode)
+        stream_copy: The audio is joined by the concat demuxer with -c:a copy
+            instead (none mode only), so no audio filters are needed
 
     Returns:
-        List of audio filter strings
+        List of audio filter strings (empty when stream_copy is set); the
+        output label is given by get_final_audio_label
 
     Raises:
-        ValueError: If audio_transition_mode is invalid
+        ValueError: If audio_transition_mode is invalid, durations are
+            missing for flat_afade mode, or stream_copy is set for a mode
+            other than none
     """
+    if stream_copy:
+        if audio_transition_mode != 'none':
+            raise ValueError(
+                f"Audio stream copy needs audio_transition_mode 'none', not {audio_transition_mode}"
+            )
+        return []
+
     audio_filters = []
 
+    # Every mode reads the same input pads; format them once
+    input_labels = [f"[{i}:a]" for i in range(first_input, first_input + num_videos)]
+
     if audio_transition_mode == 'none':
-        concat_inputs = ''.join([f"[{i}:a]" for i in range(num_videos)])
+        concat_inputs = ''.join(input_labels)
         audio_filters.append(
             f"{concat_inputs}concat=n={num_videos}:v=0:a=1[final_audio]"
         )
 
     elif audio_transition_mode == 'gap':
-        num_segments = num_videos + (num_videos - 1)
+        # One silence source between each pair of clips
+        silence = f"aevalsrc=exprs=0:d={audio_gap_duration}"
+        audio_filters.extend(
+            f"{silence}[silence{i}]" for i in range(num_videos - 1)
+        )
 
-        silence_labels = []
-        for i in range(num_videos - 1):
-            audio_filters.append(
-                f"aevalsrc=exprs=0:d={audio_gap_duration}[silence{i}]"
-            )
-            silence_labels.append(f"[silence{i}]")
+        # Interleave: clip0, silence0, clip1, silence1, ..., clipN-1
+        parts = []
+        for i, input_label in enumerate(input_labels):
+            parts.append(input_label)
+            if i < num_videos - 1:
+                parts.append(f"[silence{i}]")
+        concat_inputs = ''.join(parts)
 
-        concat_inputs = ''.join([f"[{i}:a]{silence_labels[i] if i < len(silence_labels) else ''}" for i in range(num_videos)])
         audio_filters.append(
-            f"{concat_inputs}concat=n={num_segments}:v=0:a=1[final_audio]"
+            f"{concat_inputs}concat=n={2 * num_videos - 1}:v=0:a=1[final_audio]"
         )
 
     elif audio_transition_mode == 'crossfade':
-        for i in range(num_videos - 1):
-            if i == 0:
-                audio_filters.append(
-                    f"[{i}:a][{i+1}:a]acrossfade=d={transition_duration}[a{i}]"
-                )
-            else:
-                audio_filters.append(
-                    f"[a{i-1}][{i+1}:a]acrossfade=d={transition_duration}[a{i}]"
-                )
-
-        audio_filters.append(f"[a{num_videos-2}]final_audio")
+        # Format the duration once; only labels change between steps
+        crossfade = f"acrossfade=d={transition_duration}"
+        prev_label = input_labels[0]
+        for i, input_label in enumerate(input_labels[1:]):
+            audio_filters.append(
+                f"{prev_label}{input_label}{crossfade}[a{i}]"
+            )
+            prev_label = f"[a{i}]"
+
+    elif audio_transition_mode == 'flat_afade':
+        if durations is None or len(durations) != num_videos:
+            raise ValueError("flat_afade audio mode needs one duration per input")
+
+        # Same timeline as the acrossfade chain: clip k overlaps the end of
+        # clip k-1 by transition_duration
+        fade_in = f"afade=t=in:st=0:d={transition_duration}"
+        start = 0.0
+        labels = []
+        for i, duration in enumerate(durations):
+            fades = []
+            if i > 0:
+                fades.append(fade_in)
+            if i < num_videos - 1:
+                fades.append(f"afade=t=out:st={duration - transition_duration}:d={transition_duration}")
+            fades.append(f"adelay=delays={round(start * 1000)}:all=1")
+            audio_filters.append(f"{input_labels[i]}{','.join(fades)}[af{i}]")
+            labels.append(f"[af{i}]")
+            start += duration - transition_duration
+
+        # normalize=0: overlapping fades already sum to unity gain
+        audio_filters.append(
+            f"{''.join(labels)}amix=inputs={num_videos}:duration=longest:normalize=0[final_audio]"
+        )
 
     else:
         raise ValueError(f"Invalid audio_transition_mode: {audio_transition_mode}")
@@ -73,6 +144,319 @@ def build_audio_filters(
     return audio_filters
 
 
+def get_final_audio_label(audio_transition_mode: str, num_videos: int) -> str:
+    """
+    Get the filter graph label carrying the final mixed audio.
+
+    Args:
+        audio_transition_mode: 'gap', 'crossfade', 'flat_afade', or 'none'
+        num_videos: Number of video/audio inputs
+
+    Returns:
+        Output pad label to pass to FFmpeg's -map
+
+    Raises:
+        ValueError: If audio_transition_mode is invalid
+    """
+    if audio_transition_mode in ('gap', 'none', 'flat_afade'):
+        return '[final_audio]'
+    elif audio_transition_mode == 'crossfade':
+        return f'[a{num_videos-2}]'
+    else:
+        raise ValueError(f"Invalid audio_transition_mode: {audio_transition_mode}")
+
+
+def select_audio_mode(
+    audio_transition_mode: str,
+    transition_type: str = None,
+    use_random_transitions: bool = True,
+    num_videos: int = 0
+) -> str:
+    """
+    Pick the audio graph that implements a requested audio transition mode.
+
+    Callers using one fixed transition, or joining at least
+    FLAT_AFADE_MIN_INPUTS clips, get the flat_afade form of 'crossfade',
+    which gives the same result with fewer dependent filters.
+
+    Args:
+        audio_transition_mode: 'gap', 'crossfade', 'flat_afade', or 'none'
+        transition_type: Specific video transition in use (None = random)
+        use_random_transitions: Whether video transitions are drawn at random
+        num_videos: Number of clips being joined (default 0 = unknown)
+
+    Returns:
+        Mode to pass to build_audio_filters and get_final_audio_label
+    """
+    if audio_transition_mode == 'crossfade' and (
+        (transition_type is not None and not use_random_transitions)
+        or num_videos >= FLAT_AFADE_MIN_INPUTS
+    ):
+        return 'flat_afade'
+    return audio_transition_mode
+
+
+def choose_transitions(
+    num_junctions: int,
+    transition_type: str = None,
+    use_random_transitions: bool = True,
+    excluded_transitions: List[str] = None
+) -> List[str]:
+    """
+    Pick the transition for each junction between consecutive clips.
+
+    Args:
+        num_junctions: Number of transitions needed (clips - 1)
+        transition_type: Specific transition to use (None = random)
+        use_random_transitions: Use different transition for each segment
+        excluded_transitions: Transitions to exclude from random selection
+
+    Returns:
+        Transition name per junction, in order
+    """
+    if use_random_transitions:
+        return [
+            get_random_transition(exclude=excluded_transitions)
+            for _ in range(num_junctions)
+        ]
+    return [transition_type if transition_type else 'fade'] * num_junctions
+
+
+def build_video_filters(
+    durations: List[float],
+    transition_duration: float = 1.0,
+    transition_type: str = None,
+    use_random_transitions: bool = True,
+    excluded_transitions: List[str] = None,
+    input_labels: List[str] = None,
+    transitions: List[str] = None
+) -> List[str]:
+    """
+    Build the xfade filter chain joining consecutive video streams.
+
+    Args:
+        durations: Duration of each input stream in seconds
+        transition_duration: Duration of each transition (default 1.0s)
+        transition_type: Specific transition to use (None = random)
+        use_random_transitions: Use different transition for each segment
+        excluded_transitions: Transitions to exclude from random selection
+        input_labels: Filter pad labels of the video streams
+            (default: [0:v], [1:v], ...)
+        transitions: Pre-chosen transition for each junction; overrides
+            transition_type/use_random_transitions when given
+
+    Returns:
+        List of xfade filter strings forming a balanced tree (a single
+        concat filter when transition_duration <= 0); the final output is
+        labelled [v{len(durations)-2}]
+    """
+    if input_labels is None:
+        input_labels = [f"[{i}:v]" for i in range(len(durations))]
+
+    if transition_duration <= 0:
+        # Hard cuts: plain concat, no transition timing needed
+        return [
+            f"{''.join(input_labels)}concat=n={len(durations)}:v=1:a=0[v{len(durations)-2}]"
+        ]
+
+    num_videos = len(durations)
+
+    # Pick every junction's transition first, in order, so the random draws
+    # match the junctions regardless of the order the graph is built in
+    if transitions is None:
+        transitions = choose_transitions(
+            num_videos - 1, transition_type, use_random_transitions, excluded_transitions
+        )
+
+    # Start time of each clip in the output: each transition begins
+    # transition_duration before the accumulated stream ends (minus a small
+    # buffer), exactly as in a left-to-right xfade chain
+    cumulative_durations = accumulate(
+        (d - transition_duration for d in durations[1:-1]), initial=durations[0]
+    )
+    starts = [0.0] + [c - transition_duration - 0.05 for c in cumulative_durations]
+
+    # Format the fixed part of every xfade once, outside the loop
+    xfade_timing = f":duration={transition_duration}:offset="
+
+    # xfade only accepts 2 inputs at a time. Merge neighbouring streams
+    # pairwise, level by level, so the graph is log2(N) deep and the xfades
+    # within a level are independent of each other for FFmpeg's filter
+    # threads. Each stream is (label, index of its first clip); a merged
+    # stream's timeline starts at its first clip's start time.
+    video_filters = []
+    level = [(label, i) for i, label in enumerate(input_labels)]
+    while len(level) > 1:
+        merged = []
+        for pos in range(0, len(level) - 1, 2):
+            (left, first), (right, junction) = level[pos], level[pos + 1]
+            # The right stream's first clip enters at its start time,
+            # measured on the left stream's timeline
+            offset = starts[junction] - starts[first]
+            label = f"[v{len(video_filters)}]"
+            video_filters.append(
+                f"{left}{right}xfade=transition={transitions[junction - 1]}{xfade_timing}{offset}{label}"
+            )
+            merged.append((label, first))
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+
+    return video_filters
+
+
+def check_transition_fits(
+    paths: List[Path],
+    durations: List[float],
+    transition_duration: float
+) -> None:
+    """
+    Check that every clip outlasts the transitions on its edges.
+
+    A shorter clip would give xfade a negative offset and afade a negative
+    start, which FFmpeg either rejects deep in the graph or renders wrongly.
+
+    Args:
+        paths: Source file of each clip, for the error message
+        durations: Duration of each clip in seconds
+        transition_duration: Duration of each transition (<= 0 = hard cuts)
+
+    Raises:
+        ValueError: If a clip is too short for its transitions
+    """
+    if transition_duration <= 0:
+        return
+
+    min_duration = transition_duration + 0.1
+    for path, duration in zip(paths, durations):
+        if duration <= min_duration:
+            raise ValueError(
+                f"Clip {Path(path).name} is {duration:.2f}s, too short for a "
+                f"{transition_duration}s transition (needs > {min_duration:.2f}s)"
+            )
+
+
+def build_video_concat_filter(
+    durations: List[float],
+    transition_duration: float = 1.0,
+    transition_type: str = None,
+    use_random_transitions: bool = True,
+    excluded_transitions: List[str] = None,
+    audio_transition_mode: str = 'gap',
+    audio_gap_duration: float = 0.5,
+    first_audio_input: int = 0,
+    input_labels: List[str] = None,
+    transitions: List[str] = None,
+    upload_filter: str = None,
+    audio_durations: List[float] = None,
+    audio_stream_copy: bool = False
+) -> Tuple[str, str, Optional[str]]:
+    """
+    Build the complete video + audio filter graph for joining clips.
+
+    Pure function: nothing is probed or run, so it can be called in a loop
+    (e.g. to compare transition sets). Random transitions are drawn here,
+    before the memoized builder, so only the deterministic part is cached.
+
+    Args:
+        durations: Duration of each video stream in seconds
+        transition_duration: Duration of each transition (default 1.0s)
+        transition_type: Specific transition to use (None = random)
+        use_random_transitions: Use different transition for each segment
+        excluded_transitions: Transitions to exclude from random selection
+        audio_transition_mode: 'gap', 'crossfade', 'flat_afade', or 'none' (default 'gap')
+        audio_gap_duration: Duration of silence gap in seconds for gap mode (default 0.5)
+        first_audio_input: FFmpeg input index of the first audio stream (default 0)
+        input_labels: Filter pad labels of the video streams (default: [0:v], [1:v], ...)
+        transitions: Pre-chosen transition for each junction (overrides random choice)
+        upload_filter: Filter appended to the finished video stream, e.g. a
+            hardware upload (default None)
+        audio_durations: Duration of each audio stream (default: durations)
+        audio_stream_copy: Leave the audio out of the graph, for a caller that
+            copies it with the concat demuxer (none mode only)
+
+    Returns:
+        Tuple of (filter_complex, video output label, audio output label);
+        the audio label is None when audio_stream_copy is set
+
+    Raises:
+        ValueError: If audio_transition_mode is invalid, or audio_stream_copy
+            is set for a mode other than none
+
+    Example:
+        graph, video_label, audio_label = build_video_concat_filter(
+            [5.0, 4.0], transitions=['fade'], audio_transition_mode='none'
+        )
+        # Returns: ('[0:v][1:v]xfade=...[v0];[0:a][1:a]concat=...[final_audio]',
+        #           '[v0]', '[final_audio]')
+    """
+    if transitions is None and transition_duration > 0:
+        transitions = choose_transitions(
+            len(durations) - 1, transition_type, use_random_transitions, excluded_transitions
+        )
+    audio_mode = select_audio_mode(
+        audio_transition_mode, transition_type, use_random_transitions, len(durations)
+    )
+
+    return _build_concat_filter_cached(
+        tuple(durations),
+        transition_duration,
+        tuple(transitions) if transitions is not None else None,
+        audio_mode,
+        audio_gap_duration,
+        first_audio_input,
+        tuple(input_labels) if input_labels is not None else None,
+        upload_filter,
+        tuple(audio_durations if audio_durations is not None else durations),
+        audio_stream_copy
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _build_concat_filter_cached(
+    durations: Tuple[float, ...],
+    transition_duration: float,
+    transitions: Optional[Tuple[str, ...]],
+    audio_mode: str,
+    audio_gap_duration: float,
+    first_audio_input: int,
+    input_labels: Optional[Tuple[str, ...]],
+    upload_filter: Optional[str],
+    audio_durations: Tuple[float, ...],
+    audio_stream_copy: bool
+) -> Tuple[str, str, Optional[str]]:
+    """
+    Memoized core of build_video_concat_filter; every argument is hashable.
+    """
+    num_videos = len(durations)
+    video_filters = build_video_filters(
+        list(durations),
+        transition_duration=transition_duration,
+        input_labels=list(input_labels) if input_labels is not None else None,
+        transitions=list(transitions) if transitions is not None else None
+    )
+
+    video_label = f'[v{num_videos-2}]'
+    if upload_filter:
+        video_filters.append(f"{video_label}{upload_filter}[vout]")
+        video_label = '[vout]'
+
+    audio_filters = build_audio_filters(
+        num_videos=num_videos,
+        audio_transition_mode=audio_mode,
+        transition_duration=transition_duration,
+        audio_gap_duration=audio_gap_duration,
+        first_input=first_audio_input,
+        durations=list(audio_durations),
+        stream_copy=audio_stream_copy
+    )
+
+    filter_complex = ";".join(video_filters + audio_filters)
+    if audio_stream_copy:
+        return filter_complex, video_label, None
+    return filter_complex, video_label, get_final_audio_label(audio_mode, num_videos)
+
+
 def get_video_duration(video_path: Path) -> float:
     """
     Get video duration using ffprobe.
@@ -87,21 +471,289 @@ def get_video_duration(video_path: Path) -> float:
         subprocess.CalledProcessError: If ffprobe fails
         ValueError: If video duration is invalid
     """
+    return get_duration(video_path)
+
+
+def get_video_durations(video_paths: List[Path]) -> List[float]:
+    """
+    Get durations for several videos, probing them concurrently.
+
+    Args:
+        video_paths: Paths to video files
+
+    Returns:
+        Durations in seconds, in the same order as video_paths
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails for any file
+        ValueError: If any video duration is invalid
+    """
+    durations = get_durations(video_paths)
+    return [durations[Path(vp)] for vp in video_paths]
+
+
+# Stream parameters that must agree across clips for a -c copy concat
+STREAM_COPY_FIELDS = (
+    'codec_type', 'codec_name', 'width', 'height', 'pix_fmt', 'r_frame_rate',
+    'sample_rate', 'channels'
+)
+
+# Audio codecs the MP4 output can take without re-encoding
+COPYABLE_AUDIO_CODECS = ('aac', 'mp3')
+
+
+def get_video_info(video_path: Path) -> List[Dict[str, str]]:
+    """
+    Get the codec parameters of every stream in a video using ffprobe.
+
+    Results are cached per process, keyed on path, size and mtime, so the
+    stream-copy and audio-copy checks share one ffprobe run per file.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        One dict per stream, holding the STREAM_COPY_FIELDS ffprobe reports
+        for it (video streams have no sample_rate, audio streams no width)
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails
+
+    Example:
+        get_video_info(Path("clip.mp4"))
+        # Returns: [{'codec_type': 'video', 'codec_name': 'h264', 'width': 1920, ...},
+        #           {'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '44100', ...}]
+    """
+    try:
+        st = os.stat(video_path)
+    except OSError:
+        # Let ffprobe report the problem
+        return _probe_video_info(str(video_path))
+    streams = _cached_video_info(os.path.abspath(video_path), st.st_size, st.st_mtime_ns)
+    # Copies, so callers cannot change the cached entry
+    return [dict(stream) for stream in streams]
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_video_info(path: str, size: int, mtime_ns: int) -> List[Dict[str, str]]:
+    """
+    Memoized _probe_video_info; size and mtime_ns only key the cache.
+    """
+    return _probe_video_info(path)
+
+
+def _probe_video_info(path: str) -> List[Dict[str, str]]:
+    """
+    Run ffprobe for the STREAM_COPY_FIELDS of every stream in a file.
+    """
+    cmd = [
+        FFPROBE,
+        '-v', 'error',
+        '-show_entries', f"stream={','.join(STREAM_COPY_FIELDS)}",
+        '-of', 'json',
+        path
+    ]
+
+    # Both parsers accept raw bytes, so skip decoding stdout to str first
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        check=True
+    )
+
+    return _json.loads(result.stdout).get('streams', [])
+
+
+def _get_video_infos(video_paths: List[Path]) -> List[List[Dict[str, str]]]:
+    """
+    Run get_video_info for every file concurrently, keeping input order.
+
+    Each distinct path is probed once, even if it is listed several times.
+    """
+    unique = list(dict.fromkeys(video_paths))
+    max_workers = min(16, len(unique)) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        infos = dict(zip(unique, executor.map(get_video_info, unique)))
+    return [infos[path] for path in video_paths]
+
+
+def can_stream_copy(video_paths: List[Path]) -> bool:
+    """
+    Check whether clips can be joined by the concat demuxer with -c copy.
+
+    Args:
+        video_paths: List of video file paths
+
+    Returns:
+        True if every clip has the same streams with the same codec,
+        resolution, pixel format, frame rate and audio layout
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails for any file
+    """
+    infos = _get_video_infos(video_paths)
+    return bool(infos[0]) and all(info == infos[0] for info in infos[1:])
+
+
+def can_copy_audio(paths: List[Path]) -> bool:
+    """
+    Check whether the files' audio can be joined with -c:a copy.
+
+    Only the first audio stream of each file is compared, as that is the
+    one the concat demuxer output maps. The streams come from
+    get_video_info, so files can_stream_copy already looked at are not
+    probed again.
+
+    Args:
+        paths: Audio or video file paths
+
+    Returns:
+        True if every file's first audio stream has the same codec, sample
+        rate and channel count, and that codec is in COPYABLE_AUDIO_CODECS
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails for any file
+    """
+    params = []
+    for info in _get_video_infos(paths):
+        audio = next((s for s in info if s.get('codec_type') == 'audio'), None)
+        if audio is None:
+            return False
+        params.append((audio.get('codec_name'), audio.get('sample_rate'), audio.get('channels')))
+    return params[0][0] in COPYABLE_AUDIO_CODECS and all(p == params[0] for p in params[1:])
+
+
+def _concat_list_entry(video_path: Path) -> str:
+    """
+    Format one concat demuxer "file" line for a clip.
+    """
+    # Absolute file: URLs. The demuxer resolves plain entries against the
+    # list's own URL, which for a list read from stdin is pipe:, so
+    # '/tmp/a.mp4' would become 'pipe:/tmp/a.mp4' instead of a file
+    escaped = str(Path(video_path).resolve()).replace("'", "'\\''")
+    return f"file 'file:{escaped}'\n"
+
+
+def write_concat_list(video_paths: List[Path], temp_dir: Path = None) -> Path:
+    """
+    Write an FFmpeg concat demuxer list file for the given clips.
+
+    Args:
+        video_paths: List of video file paths in order
+        temp_dir: Directory for the list file (default: system temp dir)
+
+    Returns:
+        Path to the list file (caller is responsible for deleting it)
+    """
+    with tempfile.NamedTemporaryFile(
+        mode='w', prefix='concat_', suffix='.txt', dir=temp_dir, delete=False
+    ) as list_file:
+        for vp in video_paths:
+            list_file.write(_concat_list_entry(vp))
+    return Path(list_file.name)
+
+
+def concatenate_videos_stream_copy(
+    video_paths: List[Path],
+    output_path: Path,
+    temp_dir: Path = None
+) -> Path:
+    """
+    Concatenate clips back to back without re-encoding.
+
+    Uses the concat demuxer with -c copy, so this is a pure remux and only
+    valid when every clip shares the same codec parameters (as clips from
+    create_ken_burns_video do).
+
+    Args:
+        video_paths: List of video file paths in order
+        output_path: Path for final output video
+        temp_dir: Directory for the concat list file (default: system temp dir)
+
+    Returns:
+        Path to output video
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails
+    """
+    list_path = write_concat_list(video_paths, temp_dir)
+    try:
+        cmd = [
+            FFMPEG,
+            *FFMPEG_LOG_ARGS,
+            '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', str(list_path),
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            str(output_path)
+        ]
+        run_ffmpeg(cmd)
+    finally:
+        os.unlink(list_path)
+
+    return output_path
+
+
+@contextmanager
+def stream_copy_concat(output_path: Path) -> Iterator[Callable[[Path], None]]:
+    """
+    Start a stream-copy concat early and feed it clips as they become ready.
+
+    The concat demuxer reads its list from stdin, so FFmpeg can start up
+    while the last clips are still encoding. Clips must be added in
+    playback order and share codec parameters, as with
+    concatenate_videos_stream_copy.
+
+    Args:
+        output_path: Path for final output video
+
+    Yields:
+        Callable taking the next clip path
+
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails
+
+    Example:
+        with stream_copy_concat(Path("final.mp4")) as add_clip:
+            add_clip(Path("pair_001.mp4"))
+            add_clip(Path("pair_002.mp4"))
+    """
     cmd = [
-        'ffprobe',
-        '-v', 'quiet',
-        '-print_format', 'json',
-        '-show_format',
-        str(video_path)
+        FFMPEG,
+        *FFMPEG_LOG_ARGS,
+        '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-protocol_whitelist', 'file,pipe',
+        '-i', 'pipe:0',
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        str(output_path)
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-    data = json.loads(result.stdout)
-    duration = float(data['format']['duration'])
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+    def add_clip(video_path: Path) -> None:
+        proc.stdin.write(_concat_list_entry(video_path).encode())
+        proc.stdin.flush()
 
-    if duration <= 0:
-        raise ValueError(f"Invalid duration: {duration}")
+    try:
+        yield add_clip
+    except BaseException:
+        proc.kill()
+        proc.communicate()
+        raise
 
-    return duration
+    # Closing stdin ends the list; FFmpeg then finishes the remux
+    _, stderr = proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
 
 
 def concatenate_videos_with_transitions(
@@ -112,11 +764,30 @@ def concatenate_videos_with_transitions(
     use_random_transitions: bool = True,
     excluded_transitions: List[str] = None,
     audio_transition_mode: str = 'gap',
-    audio_gap_duration: float = 0.5
+    audio_gap_duration: float = 0.5,
+    skip_video_transitions: bool = False,
+    temp_dir: Path = None,
+    encoder: str = 'auto',
+    transitions: List[str] = None,
+    threads: int = 0,
+    audio_paths: List[Path] = None,
+    durations: List[float] = None
 ) -> Path:
     """
     Concatenate multiple videos with smooth transitions.
 
+    When no transitions are needed (transition_duration <= 0 or
+    skip_video_transitions, with audio_transition_mode 'none') and every clip
+    shares the same codec parameters, the clips are joined with a stream copy
+    instead of being re-encoded.
+
+    When audio_paths is given the clips are treated as video-only, and the
+    audio graph reads the original audio files instead.
+
+    With audio_transition_mode 'none' and matching AAC or MP3 streams (see
+    can_copy_audio), the audio is joined by the concat demuxer and copied
+    rather than decoded and re-encoded; only the video is filtered.
+
     Args:
         video_paths: List of video file paths in order
         output_path: Path for final output video
@@ -124,14 +795,26 @@ def concatenate_videos_with_transitions(
         transition_type: Specific transition to use (None = random)
         use_random_transitions: Use different transition for each segment
         excluded_transitions: Transitions to exclude from random selection
-        audio_transition_mode: Audio transition mode: 'gap', 'crossfade', or 'none' (default 'gap')
+        audio_transition_mode: Audio transition mode: 'gap', 'crossfade',
+            'flat_afade', or 'none' (default 'gap')
         audio_gap_duration: Duration of silence gap in seconds for gap mode (default 0.5)
+        skip_video_transitions: Join clips with hard cuts regardless of transition_duration
+        temp_dir: Directory for the concat list or filter script file
+        encoder: H.264 encoder name, or 'auto' to pick hardware if available
+        transitions: Pre-chosen transition for each junction (overrides random choice)
+        threads: FFmpeg encoder and filter graph threads (default 0 = let FFmpeg decide)
+        audio_paths: Audio file per clip, for silent clips (default None = use
+            each clip's own audio stream)
+        durations: Known duration of each clip in seconds (default None =
+            probe them with ffprobe)
 
     Returns:
         Path to output video
 
     Raises:
-        ValueError: If less than 2 videos provided
+        FileNotFoundError: If any video or audio input does not exist
+        ValueError: If less than 2 videos provided, audio_paths/durations is
+            mismatched, or a clip is too short for its transitions
         subprocess.CalledProcessError: If FFmpeg fails
 
     Example:
@@ -144,81 +827,176 @@ def concatenate_videos_with_transitions(
     """
     if len(video_paths) < 2:
         raise ValueError("At least 2 videos required for concatenation with transitions")
+    if audio_paths is not None and len(audio_paths) != len(video_paths):
+        raise ValueError("video_paths and audio_paths must have the same length")
+    if durations is not None and len(durations) != len(video_paths):
+        raise ValueError("video_paths and durations must have the same length")
+
+    # Converted once, for the existence check and the FFmpeg input arguments
+    input_files = [str(path) for path in chain(video_paths, audio_paths or [])]
+
+    # Fail here rather than after FFmpeg has opened every other input
+    for path in input_files:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Input file not found: {path}")
+
+    if skip_video_transitions:
+        transition_duration = 0
+
+    # Nothing to blend: remux instead of decode + encode, if the clips allow it
+    if (
+        transition_duration <= 0
+        and audio_transition_mode == 'none'
+        and audio_paths is None
+        and can_stream_copy(video_paths)
+    ):
+        return concatenate_videos_stream_copy(video_paths, output_path, temp_dir)
+
+    # Get video durations (one ffprobe per uncached clip, run concurrently)
+    if durations is None:
+        durations = get_video_durations(video_paths)
+
+    check_transition_fits(video_paths, durations, transition_duration)
+
+    # Hard audio cuts need no filtering: if every audio stream matches,
+    # the concat demuxer joins them and the packets are copied untouched
+    audio_sources = audio_paths if audio_paths is not None else video_paths
+    copy_audio = audio_transition_mode == 'none' and can_copy_audio(audio_sources)
+
+    # Build filter graph; xfade has no hardware variant, so GPU-memory
+    # encoders get only the finished stream uploaded
+    filter_complex, video_label, final_audio_label = build_video_concat_filter(
+        durations,
+        transition_duration=transition_duration,
+        transition_type=transition_type,
+        use_random_transitions=use_random_transitions,
+        excluded_transitions=excluded_transitions,
+        audio_transition_mode=audio_transition_mode,
+        audio_gap_duration=audio_gap_duration,
+        first_audio_input=len(video_paths) if audio_paths is not None else 0,
+        transitions=transitions,
+        upload_filter=hw_upload_filter(encoder),
+        audio_stream_copy=copy_audio
+    )
 
-    # Get video durations
-    durations = [get_video_duration(vp) for vp in video_paths]
-
-    # Build filter chain
-    # xfade only accepts 2 inputs at a time, so we chain them
-    video_filters = []
-    audio_filters = []
-
-    # Track cumulative offset for xfade
-    cumulative_duration = durations[0]
+    # Build FFmpeg command: '-i', path for every video, then the audio inputs
+    num_videos = len(video_paths)
+    input_args = [arg for path in input_files[:num_videos] for arg in ('-i', path)]
+
+    list_path = None
+    if copy_audio:
+        # One extra input after the videos: the concat demuxer over the audio
+        list_path = write_concat_list(audio_sources, temp_dir)
+        input_args += ['-f', 'concat', '-safe', '0', '-i', str(list_path)]
+        audio_map = f'{num_videos}:a:0'
+        audio_codec = 'copy'
+    else:
+        input_args += [arg for path in input_files[num_videos:] for arg in ('-i', path)]
+        audio_map = final_audio_label
+        audio_codec = 'aac'
+
+    try:
+        # The graph grows with every clip, so pass it by file to stay under ARG_MAX
+        with filter_script(filter_complex, temp_dir) as script_path:
+            cmd = [
+                FFMPEG,
+                *FFMPEG_LOG_ARGS,
+                '-y',
+                '-filter_complex_threads', str(threads),
+            ] + hw_device_args(encoder) + input_args + [
+                '-filter_complex_script', str(script_path),
+                '-map', video_label,
+                '-map', audio_map,
+            ] + encoder_args(encoder) + [
+                '-c:a', audio_codec,
+                '-threads', str(threads),
+                '-movflags', '+faststart',
+                str(output_path)
+            ]
+
+            run_ffmpeg(cmd)
+    finally:
+        if list_path is not None:
+            os.unlink(list_path)
 
-    for i in range(len(video_paths) - 1):
-        # Determine transition type
-        if use_random_transitions:
-            trans = get_random_transition(exclude=excluded_transitions)
-        else:
-            trans = transition_type if transition_type else 'fade'
+    return output_path
 
-        # Calculate offset: previous video duration minus transition duration - small buffer
-        offset = cumulative_duration - transition_duration - 0.05
 
-        # xfade for video
-        if i == 0:
-            # First transition: [0:v][1:v]xfade...
-            video_filters.append(
-                f"[{i}:v][{i+1}:v]xfade=transition={trans}:duration={transition_duration}:offset={offset}[v{i}]"
-            )
-        else:
-            # Chain: previous_result[v{i-1}][{i+1}:v]xfade...
-            video_filters.append(
-                f"[v{i-1}][{i+1}:v]xfade=transition={trans}:duration={transition_duration}:offset={offset}[v{i}]"
-            )
+@dataclass
+class ConcatJob:
+    """
+    One concatenate_videos_with_transitions call, for concatenate_batch.
 
-        # Update cumulative duration
-        cumulative_duration += durations[i + 1] - transition_duration
+    Attributes:
+        video_paths: List of video file paths in order
+        output_path: Path for this job's output video
+        options: Extra keyword arguments for concatenate_videos_with_transitions
+    """
+    video_paths: List[Path]
+    output_path: Path
+    options: Dict[str, Any] = field(default_factory=dict)
 
-    audio_filters = build_audio_filters(
-        num_videos=len(video_paths),
-        audio_transition_mode=audio_transition_mode,
-        transition_duration=transition_duration,
-        audio_gap_duration=audio_gap_duration
-    )
 
-    # Join all filters
-    filter_complex = ";".join(video_filters + audio_filters)
+def concatenate_batch(jobs: List[ConcatJob], max_workers: int = None) -> List[Path]:
+    """
+    Run several independent concatenations at the same time.
 
-    if audio_transition_mode == 'gap' or audio_transition_mode == 'none':
-        final_audio_label = '[final_audio]'
-    elif audio_transition_mode == 'crossfade':
-        final_audio_label = f'[a{len(video_paths)-2}]'
-    else:
-        raise ValueError(f"Invalid audio_transition_mode: {audio_transition_mode}")
+    A single libx264 encode stops scaling well before it fills a many-core
+    machine, so separate jobs run side by side and split the cores between
+    them. Each worker thread only waits on its FFmpeg process, so threads
+    are enough to keep several encodes busy. The tradeoff: each job gets
+    os.cpu_count() // max_workers threads, so one job alone finishes later
+    than it would with every core, but the batch as a whole finishes sooner.
+    A job's own 'threads' option overrides the split.
 
-    # Build FFmpeg command
-    input_args = []
-    for vp in video_paths:
-        input_args.extend(['-i', str(vp)])
+    Args:
+        jobs: Concatenations to run
+        max_workers: Jobs to run at once (default: min(len(jobs), os.cpu_count()))
 
-    cmd = [
-        'ffmpeg',
-        '-y',
-    ] + input_args + [
-        '-filter_complex', filter_complex,
-        '-map', f'[v{len(video_paths)-2}]',
-        '-map', final_audio_label,
-        '-c:v', 'libx264',
-        '-c:a', 'aac',
-        '-preset', 'fast',
-        '-crf', '23',
-        '-pix_fmt', 'yuv420p',
-        '-movflags', '+faststart',
-        str(output_path)
-    ]
+    Returns:
+        Output path of each job, in the order of jobs
 
-    subprocess.run(cmd, check=True, capture_output=True)
+    Raises:
+        Whatever the first job to fail raised (see
+        concatenate_videos_with_transitions). Jobs that have not started by
+        then are skipped; jobs already running are waited for before it is
+        raised.
 
-    return output_path
+    Example:
+        outputs = concatenate_batch([
+            ConcatJob([Path("a1.mp4"), Path("a2.mp4")], Path("a.mp4")),
+            ConcatJob([Path("b1.mp4"), Path("b2.mp4")], Path("b.mp4"),
+                      options={'transition_duration': 0.5}),
+        ])
+        # Returns: [Path("a.mp4"), Path("b.mp4")]
+    """
+    if not jobs:
+        return []
+
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or min(len(jobs), cpu_count)
+    per_job_threads = max(1, cpu_count // max_workers)
+
+    # Set by the first failing job; checked by each worker before it starts
+    # a job, so nothing new starts once a job has failed
+    failed = threading.Event()
+
+    def run(job: ConcatJob) -> Optional[Path]:
+        if failed.is_set():
+            return None
+        try:
+            return concatenate_videos_with_transitions(
+                job.video_paths,
+                job.output_path,
+                **{'threads': per_job_threads, **job.options}
+            )
+        except BaseException:
+            failed.set()
+            raise
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run, job) for job in jobs]
+        # In completion order, so the earliest failure is the one raised
+        for future in as_completed(futures):
+            future.result()
+        return [future.result() for future in futures]
@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures.
+"""
+
+import pytest
+from collections import OrderedDict
+from pathlib import Path
+
+import src.encoder_probe as encoder_probe
+import src.probe_cache as probe_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_probe_cache(monkeypatch, tmp_path):
+    """Keep every test away from the developer's real on-disk probe cache."""
+    monkeypatch.setattr(probe_cache, "CACHE_PATH", tmp_path / "probe_cache" / "probe.sqlite3")
+    monkeypatch.setattr(probe_cache, "_memory_cache", OrderedDict())
+
+
+@pytest.fixture(autouse=True)
+def software_encoders_only(monkeypatch):
+    """Resolve encoder='auto' to libx264 without listing or test-encoding host encoders."""
+    monkeypatch.setattr(encoder_probe, "available_encoders", lambda: ('libx264', 'aac'))
+    monkeypatch.setattr(encoder_probe, "encoder_works", lambda encoder: encoder == 'libx264')
+
+
+@pytest.fixture
+def record_ffmpeg():
+    """Build run_ffmpeg stand-ins that also read the filter script while it exists."""
+    def make(commands, graphs):
+        def run(cmd):
+            commands.append(cmd)
+            if '-filter_complex_script' in cmd:
+                graphs.append(Path(cmd[cmd.index('-filter_complex_script') + 1]).read_text())
+        return run
+    return make
+
+
+@pytest.fixture
+def touch():
+    """Create empty placeholder files and return their paths."""
+    def make(*paths):
+        for path in paths:
+            path.write_bytes(b"")
+        return list(paths)
+    return make
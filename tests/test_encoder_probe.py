@@ -0,0 +1,72 @@
+"""
+Tests for encoder selection.
+"""
+
+import pytest
+
+import src.encoder_probe as encoder_probe
+from src.encoder_probe import encoder_args, resolve_encoder, select_encoder
+
+
+def test_select_encoder_falls_back_to_libx264(monkeypatch):
+    """Test that libx264 is used when no hardware encoder is listed."""
+    monkeypatch.setattr(encoder_probe, "available_encoders", lambda: ('libx264', 'aac'))
+
+    assert select_encoder() == 'libx264'
+
+
+def test_select_encoder_skips_unusable_hardware(monkeypatch):
+    """Test that a listed encoder failing its test encode is skipped."""
+    monkeypatch.setattr(
+        encoder_probe, "available_encoders",
+        lambda: ('h264_nvenc', 'h264_qsv', 'libx264')
+    )
+    monkeypatch.setattr(encoder_probe, "encoder_works", lambda name: name == 'h264_qsv')
+
+    assert select_encoder() == 'h264_qsv'
+
+
+def test_resolve_encoder_explicit():
+    """Test that an explicit encoder is returned unchanged."""
+    assert resolve_encoder('h264_videotoolbox') == 'h264_videotoolbox'
+
+
+def test_resolve_encoder_invalid():
+    """Test that unknown encoders raise error."""
+    with pytest.raises(ValueError, match="Unsupported encoder"):
+        resolve_encoder('mpeg2video')
+
+
+def test_encoder_args_libx264():
+    """Test software encoder arguments match the previous defaults."""
+    assert encoder_args('libx264') == [
+        '-c:v', 'libx264', '-preset', 'fast', '-crf', '23', '-pix_fmt', 'yuv420p'
+    ]
+
+
+def test_intermediate_args_mezzanine():
+    """Test that mezzanine codecs bypass the H.264 encoder choice."""
+    from src.encoder_probe import INTERMEDIATE_EXTENSIONS, intermediate_args
+
+    assert intermediate_args('prores')[:2] == ['-c:v', 'prores_ks']
+    assert intermediate_args('ffv1')[:2] == ['-c:v', 'ffv1']
+    assert intermediate_args('h264', 'libx264') == encoder_args('libx264')
+    assert INTERMEDIATE_EXTENSIONS['prores'] == '.mov'
+
+
+def test_intermediate_args_unsupported():
+    """Test that an unknown intermediate codec raises error."""
+    from src.encoder_probe import intermediate_args
+
+    with pytest.raises(ValueError, match="Unsupported intermediate codec"):
+        intermediate_args('rawvideo')
+
+
+def test_vaapi_uploads_at_graph_boundary():
+    """Test that VA-API gets a device and an upload filter, software encoders neither."""
+    from src.encoder_probe import hw_device_args, hw_upload_filter
+
+    assert hw_device_args('h264_vaapi') == ['-vaapi_device', encoder_probe.VAAPI_DEVICE]
+    assert hw_upload_filter('h264_vaapi') == 'format=nv12,hwupload'
+    assert hw_device_args('libx264') == []
+    assert hw_upload_filter('libx264') is None
@@ -5,7 +5,13 @@ Tests for Ken Burns effect generator.
 import pytest
 from pathlib import Path
 
-from src.ken_burns import calculate_random_position
+from src.ken_burns import (
+    calculate_random_position,
+    build_zoompan_filter,
+    POSITION_REGIONS,
+    ZOOM_PRECISION,
+    _POSITION_EXPRS
+)
 
 
 def test_calculate_random_position():
@@ -59,3 +65,124 @@ def test_create_ken_burns_video_invalid_audio():
     """Test that invalid audio file raises error."""
     # Note: This test requires FFmpeg
     pytest.skip("Requires FFmpeg")
+
+
+def test_build_zoompan_filter():
+    """Test zoompan runs at the precision multiple and scales back down."""
+    vf = build_zoompan_filter(total_frames=90, width=1280, height=720, fps=30)
+
+    assert vf.startswith(f"scale=-2:ih*{ZOOM_PRECISION}:flags=lanczos,zoompan=")
+    assert f"s={1280 * ZOOM_PRECISION}x{720 * ZOOM_PRECISION}" in vf
+    assert ':d=90:' in vf
+    assert vf.endswith("scale=1280:720:flags=lanczos,format=yuv420p")
+
+
+def test_position_expressions_cover_all_regions():
+    """Test that every region has a zoompan expression pair."""
+    assert set(_POSITION_EXPRS) == set(POSITION_REGIONS)
+    assert _POSITION_EXPRS["center"] == ("'iw/2-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'")
+    assert _POSITION_EXPRS["right_center"] == ("'iw-(iw/15)-(iw/zoom/2)'", "'ih/2-(ih/zoom/2)'")
+
+
+def test_calculate_random_position_seeded():
+    """Test that a seeded generator gives reproducible positions."""
+    import random
+
+    first = [calculate_random_position(random.Random(7)) for _ in range(5)]
+    second = [calculate_random_position(random.Random(7)) for _ in range(5)]
+
+    assert first == second
+
+
+def test_build_zoompan_filter_explicit_position():
+    """Test that an explicit region is used instead of a random one."""
+    vf = build_zoompan_filter(total_frames=90, position="top_left")
+
+    x_expr, y_expr = _POSITION_EXPRS["top_left"]
+    assert f"x={x_expr}:y={y_expr}:" in vf
+
+
+def test_create_ken_burns_video_uses_given_duration(monkeypatch):
+    """Test that a pre-probed duration skips ffprobe entirely."""
+    import src.ken_burns as ken_burns
+
+    def fail_probe(path):
+        raise AssertionError("audio should not be probed")
+
+    commands = []
+    monkeypatch.setattr(ken_burns, "get_audio_duration", fail_probe)
+    monkeypatch.setattr(ken_burns, "run_ffmpeg", commands.append)
+
+    ken_burns.create_ken_burns_video(
+        Path("image.jpg"), Path("audio.mp3"), Path("out.mp4"),
+        duration=2.0, fps=30, encoder='libx264'
+    )
+
+    cmd = commands[0]
+    assert cmd[1:4] == ['-nostats', '-loglevel', 'error']
+    assert cmd[cmd.index('-vframes') + 1] == '60'
+    assert cmd[cmd.index('-t') + 1] == '2.0'
+
+
+def test_create_ken_burns_video_invalid_duration():
+    """Test that a non-positive duration raises error."""
+    from src.ken_burns import create_ken_burns_video
+
+    with pytest.raises(ValueError, match="Invalid duration"):
+        create_ken_burns_video(
+            Path("image.jpg"), Path("audio.mp3"), Path("out.mp4"), duration=0
+        )
+
+
+def test_create_ken_burns_video_intermediate_codec(monkeypatch):
+    """Test that a mezzanine codec replaces the H.264 encoder arguments."""
+    import src.ken_burns as ken_burns
+
+    commands = []
+    monkeypatch.setattr(ken_burns, "run_ffmpeg", commands.append)
+
+    ken_burns.create_ken_burns_video(
+        Path("image.jpg"), Path("audio.mp3"), Path("out.mov"),
+        duration=2.0, encoder='libx264', codec='prores'
+    )
+
+    cmd = commands[0]
+    assert cmd[cmd.index('-c:v') + 1] == 'prores_ks'
+    assert 'libx264' not in cmd
+
+
+def test_create_ken_burns_video_intermediate_pixel_format(monkeypatch):
+    """Test that the filter ends in the intermediate's pixel format, not yuv420p."""
+    import src.ken_burns as ken_burns
+
+    commands = []
+    monkeypatch.setattr(ken_burns, "run_ffmpeg", commands.append)
+
+    ken_burns.create_ken_burns_video(
+        Path("image.jpg"), Path("audio.mp3"), Path("out.mov"),
+        duration=2.0, encoder='libx264', codec='prores'
+    )
+
+    cmd = commands[0]
+    vf = cmd[cmd.index('-vf') + 1]
+    assert vf.endswith("format=yuv422p10le")
+    assert 'yuv420p' not in vf
+    assert cmd[cmd.index('-pix_fmt') + 1] == 'yuv422p10le'
+
+
+def test_create_ken_burns_video_silent(monkeypatch):
+    """Test that a silent clip neither reads nor encodes audio."""
+    import src.ken_burns as ken_burns
+
+    commands = []
+    monkeypatch.setattr(ken_burns, "run_ffmpeg", commands.append)
+
+    ken_burns.create_ken_burns_video(
+        Path("image.jpg"), Path("audio.mp3"), Path("out.mov"),
+        duration=2.0, encoder='libx264', include_audio=False
+    )
+
+    cmd = commands[0]
+    assert cmd.count('-i') == 1
+    assert '-an' in cmd
+    assert '-c:a' not in cmd
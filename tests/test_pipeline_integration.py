@@ -79,3 +79,78 @@ def test_discover_and_pair_files_wrong_format():
 
         with pytest.raises(ValueError, match="No matching image/audio pairs"):
             discover_and_pair_files(images_dir, audio_dir)
+
+
+def test_discover_and_pair_files_shared_directory():
+    """Test file discovery when images and audio live in the same directory."""
+    with tempfile.TemporaryDirectory() as temp_root:
+        media_dir = Path(temp_root)
+
+        (media_dir / "image_001.png").write_text("image 1")
+        (media_dir / "audio_001.wav").write_text("audio 1")
+        (media_dir / "notes.txt").write_text("ignored")
+        (media_dir / "image_002.png").mkdir()  # directories are skipped
+
+        pairs = discover_and_pair_files(media_dir, media_dir)
+
+        assert pairs == [(media_dir / "image_001.png", media_dir / "audio_001.wav", 1)]
+
+
+def test_run_pipeline_large_batches_use_two_pass(monkeypatch, tmp_path):
+    """Test that more pairs than one graph should hold switch to two-pass."""
+    import src.pipeline as pipeline
+
+    for i in (1, 2, 3):
+        (tmp_path / f"image_{i:03d}.jpg").write_text("fake image")
+        (tmp_path / f"audio_{i:03d}.mp3").write_text("fake audio")
+
+    concat_calls = []
+    monkeypatch.setattr(pipeline, "MAX_SINGLE_PASS_PAIRS", 2)
+    monkeypatch.setattr(pipeline, "probe_durations", lambda paths: {p: 5.0 for p in paths})
+    monkeypatch.setattr(pipeline, "resolve_encoder", lambda encoder: 'libx264')
+    monkeypatch.setattr(
+        pipeline, "render_single_pass", lambda **kwargs: pytest.fail("single pass used")
+    )
+    monkeypatch.setattr(pipeline, "process_single_pair", lambda args, **options: args[2])
+    monkeypatch.setattr(
+        pipeline, "concatenate_videos_with_transitions",
+        lambda **kwargs: concat_calls.append(kwargs) or kwargs['output_path']
+    )
+
+    pipeline.run_pipeline(tmp_path, tmp_path, tmp_path / "final.mp4", temp_dir=tmp_path / "work")
+
+    assert len(concat_calls) == 1
+    assert len(concat_calls[0]['video_paths']) == 3
+
+
+def test_run_pipeline_two_pass_uses_output_geometry(monkeypatch, tmp_path):
+    """Test that two-pass clips are rendered at the requested size and frame rate."""
+    import src.ken_burns as ken_burns
+    import src.pipeline as pipeline
+
+    for i in (1, 2):
+        (tmp_path / f"image_{i:03d}.jpg").write_text("fake image")
+        (tmp_path / f"audio_{i:03d}.mp3").write_text("fake audio")
+
+    commands, concat_calls = [], []
+    monkeypatch.setattr(pipeline, "probe_durations", lambda paths: {p: 5.04 for p in paths})
+    monkeypatch.setattr(pipeline, "resolve_encoder", lambda encoder: 'libx264')
+    monkeypatch.setattr(ken_burns, "run_ffmpeg", commands.append)
+    monkeypatch.setattr(
+        pipeline, "concatenate_videos_with_transitions",
+        lambda **kwargs: concat_calls.append(kwargs) or kwargs['output_path']
+    )
+
+    pipeline.run_pipeline(
+        tmp_path, tmp_path, tmp_path / "final.mp4",
+        width=320, height=180, fps=10, single_pass=False, temp_dir=tmp_path / "work"
+    )
+
+    assert len(commands) == 2
+    for cmd in commands:
+        assert cmd[cmd.index('-r') + 1] == '10'
+        assert cmd[cmd.index('-vframes') + 1] == '50'
+        vf = cmd[cmd.index('-vf') + 1]
+        assert 's=640x360:fps=10' in vf
+        assert 'scale=320:180:' in vf
+    assert concat_calls[0]['durations'] == [5.0, 5.0]
@@ -0,0 +1,181 @@
+"""
+Tests for the on-disk probe cache.
+"""
+
+import pytest
+from collections import OrderedDict
+from pathlib import Path
+
+import src.probe_cache as probe_cache
+
+
+@pytest.fixture
+def fake_probe(monkeypatch, tmp_path):
+    """Redirect the cache to a temp dir and record ffprobe calls."""
+    calls = []
+
+    def _probe(path):
+        calls.append(path)
+        return 12.5
+
+    monkeypatch.setattr(probe_cache, "CACHE_PATH", tmp_path / "probe.db")
+    monkeypatch.setattr(probe_cache, "_memory_cache", OrderedDict())
+    monkeypatch.setattr(probe_cache, "_probe_one", _probe)
+    return calls
+
+
+def test_get_duration_probes_once(fake_probe, tmp_path):
+    """Test that unchanged files are only probed once."""
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+
+    assert probe_cache.get_duration(audio_file) == 12.5
+    assert probe_cache.get_duration(audio_file) == 12.5
+    assert fake_probe == [audio_file]
+
+
+def test_get_duration_persists_across_processes(fake_probe, monkeypatch, tmp_path):
+    """Test that results survive an in-memory cache reset."""
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+
+    probe_cache.get_duration(audio_file)
+    monkeypatch.setattr(probe_cache, "_memory_cache", OrderedDict())
+    probe_cache.get_duration(audio_file)
+
+    assert fake_probe == [audio_file]
+
+
+def test_get_duration_reprobes_modified_file(fake_probe, tmp_path):
+    """Test that a change in size invalidates the cached entry."""
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+    probe_cache.get_duration(audio_file)
+
+    audio_file.write_text("longer fake audio")
+    probe_cache.get_duration(audio_file)
+
+    assert fake_probe == [audio_file, audio_file]
+
+
+def test_get_durations_multiple_files(fake_probe, tmp_path):
+    """Test batch lookup returns a duration per path."""
+    files = []
+    for i in range(3):
+        path = tmp_path / f"audio_{i:03d}.mp3"
+        path.write_text(f"audio {i}")
+        files.append(path)
+
+    durations = probe_cache.get_durations(files)
+
+    assert durations == {path: 12.5 for path in files}
+    assert sorted(fake_probe) == files
+
+
+def test_memory_cache_evicts_least_recently_used(fake_probe, monkeypatch, tmp_path):
+    """Test that the in-memory layer stays within MEMORY_CACHE_SIZE entries."""
+    monkeypatch.setattr(probe_cache, "MEMORY_CACHE_SIZE", 2)
+    files = []
+    for i in range(3):
+        path = tmp_path / f"audio_{i:03d}.mp3"
+        path.write_text(f"audio {i}")
+        files.append(path)
+
+    probe_cache.get_duration(files[0])
+    probe_cache.get_duration(files[1])
+    probe_cache.get_duration(files[0])  # refresh: files[1] is now the oldest
+    probe_cache.get_duration(files[2])
+
+    assert len(probe_cache._memory_cache) == 2
+    assert probe_cache._cache_key(files[1]) not in probe_cache._memory_cache
+    assert probe_cache._cache_key(files[0]) in probe_cache._memory_cache
+
+
+def test_ffprobe_duration_parses_bytes(monkeypatch):
+    """Test that ffprobe's raw stdout bytes are parsed without decoding."""
+    import subprocess
+
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=b"30.500000\n")
+
+    monkeypatch.setattr(probe_cache.subprocess, "run", fake_run)
+
+    assert probe_cache._ffprobe_duration(Path("audio.mp3")) == 30.5
+    assert commands[0][commands[0].index('-of') + 1] == 'csv=p=0'
+
+
+def test_ffprobe_duration_invalid_output(monkeypatch):
+    """Test that non-numeric ffprobe output raises error."""
+    import subprocess
+
+    monkeypatch.setattr(
+        probe_cache.subprocess, "run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout=b"N/A\n")
+    )
+
+    with pytest.raises(ValueError, match="Invalid duration"):
+        probe_cache._ffprobe_duration(Path("audio.mp3"))
+
+
+def test_probe_one_prefers_worker(monkeypatch):
+    """Test that a worker answer is used without spawning ffprobe."""
+    monkeypatch.setattr(probe_cache, "probe_duration", lambda path: 7.25)
+    monkeypatch.setattr(
+        probe_cache, "_ffprobe_duration", lambda path: pytest.fail("ffprobe spawned")
+    )
+
+    assert probe_cache._probe_one(Path("audio.mp3")) == 7.25
+
+
+def test_probe_one_falls_back_to_ffprobe(monkeypatch):
+    """Test that ffprobe is used when the worker has no answer or fails."""
+    def broken_worker(path):
+        raise RuntimeError("worker failed")
+
+    monkeypatch.setattr(probe_cache, "_ffprobe_duration", lambda path: 3.0)
+
+    monkeypatch.setattr(probe_cache, "probe_duration", lambda path: None)
+    assert probe_cache._probe_one(Path("audio.mp3")) == 3.0
+
+    monkeypatch.setattr(probe_cache, "probe_duration", broken_worker)
+    assert probe_cache._probe_one(Path("audio.mp3")) == 3.0
+
+
+def test_unusable_lockfile_falls_back_to_memory(fake_probe, tmp_path):
+    """Test that a lockfile that cannot be opened only disables the disk layer."""
+    (tmp_path / "probe.db.lock").mkdir()
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+
+    assert probe_cache.get_duration(audio_file) == 12.5
+    assert probe_cache.get_duration(audio_file) == 12.5
+    assert fake_probe == [audio_file]
+
+
+def test_shared_cache_directory_is_not_used(fake_probe, monkeypatch, tmp_path):
+    """Test that a cache directory other users can write to is ignored."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    monkeypatch.setattr(probe_cache, "CACHE_PATH", shared / "probe.db")
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+
+    assert probe_cache.get_duration(audio_file) == 12.5
+    assert not (shared / "probe.db").exists()
+
+
+def test_cache_stores_plain_floats(fake_probe, tmp_path):
+    """Test that the database holds REAL values rather than pickled objects."""
+    import sqlite3
+
+    audio_file = tmp_path / "audio_001.mp3"
+    audio_file.write_text("fake audio")
+    probe_cache.get_duration(audio_file)
+
+    with sqlite3.connect(str(tmp_path / "probe.db")) as conn:
+        rows = conn.execute("SELECT key, typeof(duration), duration FROM durations").fetchall()
+    assert rows == [(probe_cache._cache_key(audio_file), 'real', 12.5)]
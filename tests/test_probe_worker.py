@@ -0,0 +1,123 @@
+"""
+Tests for the persistent PyAV probe worker.
+"""
+
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import src.probe_worker as probe_worker
+from src.probe_worker import probe_duration
+
+
+class FakeAV:
+    """Stand-in for the av module: durations keyed by path, in microseconds."""
+
+    time_base = 1000000
+
+    def __init__(self, durations):
+        self.durations = durations
+
+    @contextmanager
+    def open(self, path, metadata_errors='strict'):
+        if path not in self.durations:
+            raise FileNotFoundError(path)
+        container = type("Container", (), {"duration": self.durations[path]})()
+        yield container
+
+
+def test_probe_duration_without_pyav(monkeypatch):
+    """Test that a missing PyAV install means 'use ffprobe'."""
+    monkeypatch.setattr(probe_worker, "av", None)
+
+    assert probe_duration(Path("audio.mp3")) is None
+
+
+def test_serve_answers_queries(monkeypatch):
+    """Test the worker loop replies with durations and errors, then stops."""
+    monkeypatch.setattr(probe_worker, "av", FakeAV({"a.mp3": 30500000, "b.mp3": None}))
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = threading.Thread(target=probe_worker._serve, args=(child_conn,))
+    server.start()
+
+    parent_conn.send("a.mp3")
+    assert parent_conn.recv() == (30.5, None)
+    parent_conn.send("b.mp3")
+    assert parent_conn.recv() == (None, "no container duration")
+    parent_conn.send("missing.mp3")
+    duration, error = parent_conn.recv()
+    assert duration is None and error.startswith("FileNotFoundError")
+
+    parent_conn.send(None)
+    server.join(timeout=5)
+    assert not server.is_alive()
+
+
+def test_probe_duration_drops_dead_worker(monkeypatch):
+    """Test that a broken idle worker is discarded and the probe falls back."""
+    class DeadConn:
+        def send(self, obj):
+            raise BrokenPipeError
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(probe_worker, "av", FakeAV({}))
+    monkeypatch.setattr(probe_worker, "_idle", [(None, DeadConn())])
+    monkeypatch.setattr(probe_worker, "_spawn_failed", False)
+
+    assert probe_duration(Path("audio.mp3")) is None
+    assert probe_worker._idle == []
+    assert not probe_worker._spawn_failed
+
+
+def test_probe_duration_stops_spawning_after_failed_start(monkeypatch):
+    """Test that a worker dying before its first answer disables the pool."""
+    starts = []
+
+    def failing_start():
+        starts.append(1)
+        raise RuntimeError("attempt to start a new process before bootstrapping")
+
+    monkeypatch.setattr(probe_worker, "av", FakeAV({}))
+    monkeypatch.setattr(probe_worker, "_idle", [])
+    monkeypatch.setattr(probe_worker, "_spawn_failed", False)
+    monkeypatch.setattr(probe_worker, "_start_worker", failing_start)
+
+    assert probe_duration(Path("audio.mp3")) is None
+    assert probe_duration(Path("audio.mp3")) is None
+    assert starts == [1]
+
+
+def test_probe_duration_runs_workers_concurrently(monkeypatch):
+    """Test that concurrent probes are served by separate workers."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    class WaitingConn:
+        def send(self, path):
+            self.path = path
+
+        def recv(self):
+            barrier.wait()  # Only returns once both probes are in flight
+            return 5.0, None
+
+    monkeypatch.setattr(probe_worker, "av", FakeAV({}))
+    monkeypatch.setattr(probe_worker, "POOL_SIZE", 2)
+    monkeypatch.setattr(probe_worker, "_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(probe_worker, "_idle", [])
+    monkeypatch.setattr(probe_worker, "_spawn_failed", False)
+    monkeypatch.setattr(probe_worker, "_start_worker", lambda: (None, WaitingConn()))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(probe_duration(Path("a.mp3"))))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == [5.0, 5.0]
+    assert len(probe_worker._idle) == 2
@@ -0,0 +1,125 @@
+"""
+Tests for single-pass slideshow rendering.
+"""
+
+import pytest
+from pathlib import Path
+
+import src.single_pass as single_pass
+from src.single_pass import render_single_pass
+
+
+def test_render_single_pass_less_than_two_pairs():
+    """Test that rendering with less than 2 pairs raises error."""
+    with pytest.raises(ValueError, match="At least 2 videos"):
+        render_single_pass(
+            image_paths=[Path("image_001.jpg")],
+            audio_paths=[Path("audio_001.mp3")],
+            durations=[5.0],
+            output_path=Path("out.mp4")
+        )
+
+
+def test_render_single_pass_mismatched_inputs():
+    """Test that mismatched input lists raise error."""
+    with pytest.raises(ValueError, match="same length"):
+        render_single_pass(
+            image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+            audio_paths=[Path("audio_001.mp3")],
+            durations=[5.0, 4.0],
+            output_path=Path("out.mp4")
+        )
+
+
+def test_render_single_pass_clip_shorter_than_transition(monkeypatch):
+    """Test that a clip too short for its transition is rejected before FFmpeg runs."""
+    monkeypatch.setattr(single_pass, "run_ffmpeg", lambda cmd: pytest.fail("FFmpeg started"))
+
+    with pytest.raises(ValueError, match="image_001.jpg is 0.50s"):
+        render_single_pass(
+            image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+            audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3")],
+            durations=[0.5, 5.0],
+            output_path=Path("out.mp4")
+        )
+
+
+def test_render_single_pass_command(monkeypatch, record_ffmpeg):
+    """Test that one FFmpeg command takes every image and audio input."""
+    commands, graphs = [], []
+    monkeypatch.setattr(single_pass, "run_ffmpeg", record_ffmpeg(commands, graphs))
+
+    render_single_pass(
+        image_paths=[Path("image_001.jpg"), Path("image_002.jpg"), Path("image_003.jpg")],
+        audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3"), Path("audio_003.mp3")],
+        durations=[5.0, 4.0, 6.0],
+        output_path=Path("out.mp4"),
+        audio_transition_mode='none',
+        encoder='libx264'
+    )
+
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert cmd.count('-i') == 6
+    filter_complex = graphs[0]
+    assert '[0:v]scale=' in filter_complex
+    assert '[3:a][4:a][5:a]concat=n=3' in filter_complex
+    assert '[v1]' in cmd
+    assert '[final_audio]' in cmd
+
+
+def test_render_single_pass_threads(monkeypatch):
+    """Test that the thread count reaches both the encoder and filter graph."""
+    commands = []
+    monkeypatch.setattr(single_pass, "run_ffmpeg", commands.append)
+
+    render_single_pass(
+        image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+        audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3")],
+        durations=[5.0, 4.0],
+        output_path=Path("out.mp4"),
+        encoder='libx264',
+        threads=3
+    )
+
+    cmd = commands[0]
+    assert cmd[cmd.index('-filter_complex_threads') + 1] == '3'
+    assert cmd[cmd.index('-threads') + 1] == '3'
+
+
+def test_render_single_pass_vaapi_upload(monkeypatch, record_ffmpeg):
+    """Test that VA-API output is uploaded after the xfade chain and mapped."""
+    commands, graphs = [], []
+    monkeypatch.setattr(single_pass, "run_ffmpeg", record_ffmpeg(commands, graphs))
+
+    render_single_pass(
+        image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+        audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3")],
+        durations=[5.0, 4.0],
+        output_path=Path("out.mp4"),
+        encoder='h264_vaapi',
+        transitions=['fade']
+    )
+
+    cmd = commands[0]
+    assert cmd.index('-vaapi_device') < cmd.index('-i')
+    assert '[v0]format=nv12,hwupload[vout]' in graphs[0]
+    assert cmd[cmd.index('-map') + 1] == '[vout]'
+
+
+def test_render_single_pass_temp_dir(monkeypatch, tmp_path):
+    """Test that the filter script is written to the given temp directory."""
+    commands = []
+    monkeypatch.setattr(single_pass, "run_ffmpeg", commands.append)
+
+    render_single_pass(
+        image_paths=[Path("image_001.jpg"), Path("image_002.jpg")],
+        audio_paths=[Path("audio_001.mp3"), Path("audio_002.mp3")],
+        durations=[5.0, 4.0],
+        output_path=Path("out.mp4"),
+        encoder='libx264',
+        temp_dir=tmp_path
+    )
+
+    cmd = commands[0]
+    assert Path(cmd[cmd.index('-filter_complex_script') + 1]).parent == tmp_path
@@ -3,6 +3,8 @@ Tests for utility functions.
 """
 
 import pytest
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
@@ -10,7 +12,10 @@ from src.utils import (
     temp_dir_context,
     create_temp_filename,
     ensure_directory,
-    cleanup_temp_files
+    cleanup_temp_files,
+    require_ffmpeg,
+    run_ffmpeg,
+    filter_script
 )
 
 
@@ -41,6 +46,20 @@ def test_temp_dir_context_cleanup_on_exception():
     assert not temp_dir.exists()
 
 
+def test_create_temp_filename():
+    """Test that a unique, empty temp file is created with the given suffix."""
+    first = create_temp_filename("output", ".mp4")
+    second = create_temp_filename("output", ".mp4")
+    try:
+        assert first != second
+        assert first.name.startswith("output_")
+        assert first.suffix == ".mp4"
+        assert first.exists()
+        assert first.stat().st_size == 0
+    finally:
+        cleanup_temp_files([first, second])
+
+
 def test_ensure_directory_new():
     """Test creating a new directory."""
     with tempfile.TemporaryDirectory() as temp_root:
@@ -118,3 +137,37 @@ def test_cleanup_temp_files_mixed():
         # Only existing file should be deleted
         assert not existing_file.exists()
         assert not nonexistent_file.exists()
+
+
+def test_run_ffmpeg_success():
+    """Test that a zero exit status returns normally."""
+    run_ffmpeg([sys.executable, '-c', 'print("ok")'])
+
+
+def test_run_ffmpeg_failure_keeps_stderr():
+    """Test that a failing command raises with its stderr attached."""
+    cmd = [sys.executable, '-c', 'import sys; sys.stderr.write("boom"); sys.exit(3)']
+
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        run_ffmpeg(cmd)
+
+    assert excinfo.value.returncode == 3
+    assert excinfo.value.stderr == b"boom"
+
+
+def test_require_ffmpeg_missing(monkeypatch):
+    """Test that a missing ffmpeg/ffprobe binary is reported early."""
+    import shutil
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+
+    with pytest.raises(FileNotFoundError, match="ffmpeg not found"):
+        require_ffmpeg()
+
+
+def test_filter_script_removed_after_use(tmp_path):
+    """Test that the filter graph is written to a file that is deleted on exit."""
+    with filter_script("[0:v][1:v]xfade[v0]", tmp_path) as script_path:
+        assert script_path.parent == tmp_path
+        assert script_path.read_text() == "[0:v][1:v]xfade[v0]"
+
+    assert not script_path.exists()
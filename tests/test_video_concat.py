@@ -2,10 +2,22 @@
 Tests for video concatenation.
 """
 
+import re
+import shutil
+
 import pytest
 from pathlib import Path
 
-from src.video_concat import get_video_duration, build_audio_filters
+import src.video_concat as video_concat
+from src.video_concat import (
+    get_video_duration,
+    build_audio_filters,
+    build_video_filters,
+    build_video_concat_filter,
+    write_concat_list,
+    select_audio_mode,
+    concatenate_videos_with_transitions
+)
 
 
 def test_get_video_duration():
@@ -51,10 +63,22 @@ def test_build_audio_filters_crossfade_mode():
         transition_duration=1.0
     )
 
-    assert len(filters) == 3
-    assert 'acrossfade=d=1.0' in filters[0]
-    assert 'acrossfade=d=1.0' in filters[1]
-    assert '[a1]final_audio' in filters[2]
+    assert filters == [
+        '[0:a][1:a]acrossfade=d=1.0[a0]',
+        '[a0][2:a]acrossfade=d=1.0[a1]',
+    ]
+    assert video_concat.get_final_audio_label('crossfade', 3) == '[a1]'
+
+
+def test_audio_filters_all_have_output_labels():
+    """Test that every audio mode emits only labelled filters FFmpeg can parse."""
+    for mode in ('gap', 'crossfade', 'flat_afade', 'none'):
+        graph, _, audio_label = build_video_concat_filter(
+            [5.0, 4.0, 6.0], transitions=['fade', 'fade'], audio_transition_mode=mode
+        )
+        for filter_str in graph.split(';'):
+            assert re.search(r'\[\w+\]$', filter_str), (mode, filter_str)
+        assert graph.endswith(audio_label)
 
 
 def test_build_audio_filters_none_mode():
@@ -69,3 +93,529 @@ def test_build_audio_filters_invalid_mode():
     """Test that invalid mode raises error."""
     with pytest.raises(ValueError, match="Invalid audio_transition_mode"):
         build_audio_filters(num_videos=3, audio_transition_mode='invalid')
+
+
+def test_build_video_filters_custom_labels():
+    """Test building xfade chain over custom input labels."""
+    filters = build_video_filters(
+        [5.0, 4.0, 6.0],
+        transition_duration=1.0,
+        transition_type='fade',
+        use_random_transitions=False,
+        input_labels=['[kb0]', '[kb1]', '[kb2]']
+    )
+
+    assert len(filters) == 2
+    assert filters[0].startswith('[kb0][kb1]xfade=transition=fade')
+    assert filters[1].startswith('[v0][kb2]xfade=transition=fade')
+    assert filters[1].endswith('[v1]')
+
+
+def test_build_audio_filters_first_input():
+    """Test that audio inputs can start at a later input index."""
+    filters = build_audio_filters(num_videos=2, audio_transition_mode='none', first_input=2)
+
+    assert filters == ['[2:a][3:a]concat=n=2:v=0:a=1[final_audio]']
+
+
+def test_build_video_filters_no_transition():
+    """Test that a zero transition duration produces a plain concat."""
+    filters = build_video_filters([5.0, 4.0, 6.0], transition_duration=0)
+
+    assert filters == ['[0:v][1:v][2:v]concat=n=3:v=1:a=0[v1]']
+
+
+def test_write_concat_list(tmp_path):
+    """Test concat list file contents and quoting."""
+    clips = [tmp_path / "pair_001.mp4", tmp_path / "it's.mp4"]
+
+    list_path = write_concat_list(clips, tmp_path)
+
+    lines = list_path.read_text().splitlines()
+    assert lines[0] == f"file 'file:{clips[0].resolve()}'"
+    assert lines[1] == f"file 'file:{tmp_path.resolve()}/it'\\''s.mp4'"
+
+
+def test_concatenate_without_transitions_uses_stream_copy(monkeypatch, tmp_path, touch):
+    """Test that hard cuts with no audio transition remux instead of re-encoding."""
+    commands = []
+    monkeypatch.setattr(video_concat, "run_ffmpeg", commands.append)
+    monkeypatch.setattr(
+        video_concat, "get_video_info",
+        lambda path: [{'codec_type': 'video', 'codec_name': 'h264', 'width': 1920}]
+    )
+
+    concatenate_videos_with_transitions(
+        video_paths=touch(tmp_path / "pair_001.mp4", tmp_path / "pair_002.mp4"),
+        output_path=tmp_path / "final.mp4",
+        transition_duration=0,
+        audio_transition_mode='none',
+        encoder='libx264',
+        temp_dir=tmp_path
+    )
+
+    assert len(commands) == 1
+    assert commands[0][commands[0].index('-c') + 1] == 'copy'
+    assert '-filter_complex' not in commands[0]
+    assert not list(tmp_path.glob("concat_*"))
+
+
+@pytest.mark.skipif(
+    shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None,
+    reason="Requires FFmpeg"
+)
+def test_stream_copy_concat_real_ffmpeg(tmp_path):
+    """Test that real FFmpeg opens the clips listed on stdin and joins them."""
+    import subprocess
+
+    clips = []
+    for i in (1, 2):
+        clip = tmp_path / f"pair_00{i}.mp4"
+        subprocess.run(
+            ['ffmpeg', '-nostats', '-loglevel', 'error', '-y',
+             '-f', 'lavfi', '-i', 'testsrc=size=64x64:rate=10:duration=1',
+             '-c:v', 'libx264', '-pix_fmt', 'yuv420p', str(clip)],
+            check=True
+        )
+        clips.append(clip)
+
+    output = tmp_path / "final.mp4"
+    with video_concat.stream_copy_concat(output) as add_clip:
+        for clip in clips:
+            add_clip(clip)
+
+    assert get_video_duration(output) == pytest.approx(2.0, abs=0.2)
+
+
+def test_build_video_filters_explicit_transitions():
+    """Test that pre-chosen transitions are used in order."""
+    filters = build_video_filters(
+        [5.0, 4.0, 6.0],
+        transitions=['wipeleft', 'circleopen']
+    )
+
+    assert 'transition=wipeleft' in filters[0]
+    assert 'transition=circleopen' in filters[1]
+
+
+def test_build_audio_filters_gap_mode_interleaving():
+    """Test that silence is placed between clips but not after the last one."""
+    filters = build_audio_filters(num_videos=3, audio_transition_mode='gap', first_input=3)
+
+    assert filters[-1] == (
+        '[3:a][silence0][4:a][silence1][5:a]concat=n=5:v=0:a=1[final_audio]'
+    )
+
+
+def test_stream_copy_concat_feeds_list_on_stdin(monkeypatch, tmp_path):
+    """Test that clips are written to FFmpeg's stdin as concat entries."""
+    import io
+
+    class FakeProc:
+        def __init__(self, cmd, **kwargs):
+            self.cmd = cmd
+            self.stdin = io.BytesIO()
+            self.returncode = 0
+            procs.append(self)
+
+        def communicate(self):
+            return None, b''
+
+    procs = []
+    monkeypatch.setattr(video_concat.subprocess, "Popen", FakeProc)
+
+    with video_concat.stream_copy_concat(tmp_path / "final.mp4") as add_clip:
+        add_clip(tmp_path / "pair_001.mp4")
+        add_clip(tmp_path / "pair_002.mp4")
+
+    assert 'pipe:0' in procs[0].cmd
+    assert procs[0].stdin.getvalue().decode().splitlines() == [
+        f"file 'file:{(tmp_path / 'pair_001.mp4').resolve()}'",
+        f"file 'file:{(tmp_path / 'pair_002.mp4').resolve()}'",
+    ]
+
+
+def test_concatenate_silent_clips_reads_original_audio(monkeypatch, tmp_path, record_ffmpeg, touch):
+    """Test that audio_paths are added after the clips and feed the audio graph."""
+    commands, graphs = [], []
+    monkeypatch.setattr(video_concat, "run_ffmpeg", record_ffmpeg(commands, graphs))
+    monkeypatch.setattr(video_concat, "get_video_durations", lambda paths: [5.0] * len(paths))
+    monkeypatch.setattr(video_concat, "can_copy_audio", lambda paths: False)
+
+    concatenate_videos_with_transitions(
+        video_paths=touch(tmp_path / "pair_001.mov", tmp_path / "pair_002.mov"),
+        output_path=tmp_path / "final.mp4",
+        audio_transition_mode='none',
+        encoder='libx264',
+        transitions=['fade'],
+        audio_paths=touch(tmp_path / "audio_001.mp3", tmp_path / "audio_002.mp3")
+    )
+
+    cmd = commands[0]
+    assert cmd.count('-i') == 4
+    assert cmd.index(str(tmp_path / "audio_001.mp3")) > cmd.index(str(tmp_path / "pair_002.mov"))
+    filter_complex = graphs[0]
+    assert '[2:a][3:a]concat=n=2:v=0:a=1[final_audio]' in filter_complex
+
+
+def test_get_video_durations_keeps_order(monkeypatch, tmp_path):
+    """Test that batched durations come back in input order, duplicates included."""
+    from collections import OrderedDict
+
+    import src.probe_cache as probe_cache
+
+    lengths = {"pair_001.mp4": 5.0, "pair_002.mp4": 7.5}
+    monkeypatch.setattr(probe_cache, "CACHE_PATH", tmp_path / "probe.db")
+    monkeypatch.setattr(probe_cache, "_memory_cache", OrderedDict())
+    monkeypatch.setattr(probe_cache, "_probe_one", lambda path: lengths[path.name])
+
+    paths = [tmp_path / "pair_002.mp4", tmp_path / "pair_001.mp4", tmp_path / "pair_002.mp4"]
+    assert video_concat.get_video_durations(paths) == [7.5, 5.0, 7.5]
+
+
+def test_concatenate_with_known_durations_skips_probe(monkeypatch, tmp_path, record_ffmpeg, touch):
+    """Test that passing durations avoids ffprobe and sets the xfade offset."""
+    def fail_probe(paths):
+        raise AssertionError("clips should not be probed")
+
+    commands, graphs = [], []
+    monkeypatch.setattr(video_concat, "run_ffmpeg", record_ffmpeg(commands, graphs))
+    monkeypatch.setattr(video_concat, "get_video_durations", fail_probe)
+    monkeypatch.setattr(video_concat, "can_copy_audio", lambda paths: False)
+
+    concatenate_videos_with_transitions(
+        video_paths=touch(tmp_path / "pair_001.mov", tmp_path / "pair_002.mov"),
+        output_path=tmp_path / "final.mp4",
+        audio_transition_mode='none',
+        encoder='libx264',
+        transitions=['fade'],
+        durations=[6.0, 4.0]
+    )
+
+    assert 'offset=4.95' in graphs[0]
+
+
+def test_concatenate_mismatched_clips_reencode(monkeypatch, tmp_path, record_ffmpeg, touch):
+    """Test that clips with different parameters are not stream copied."""
+    commands, graphs = [], []
+    monkeypatch.setattr(video_concat, "run_ffmpeg", record_ffmpeg(commands, graphs))
+    monkeypatch.setattr(
+        video_concat, "get_video_info",
+        lambda path: [{'codec_type': 'video', 'codec_name': 'h264',
+                       'width': 1920 if path.name == 'pair_001.mp4' else 1280}]
+    )
+
+    concatenate_videos_with_transitions(
+        video_paths=touch(tmp_path / "pair_001.mp4", tmp_path / "pair_002.mp4"),
+        output_path=tmp_path / "final.mp4",
+        transition_duration=0,
+        audio_transition_mode='none',
+        encoder='libx264',
+        durations=[5.0, 4.0],
+        temp_dir=tmp_path
+    )
+
+    assert '-filter_complex_script' in commands[0]
+    assert 'concat=n=2:v=1:a=0' in graphs[0]
+
+
+def _simulate_xfade_graph(filters, durations):
+    """Return (output length, absolute start of each transition) for an xfade graph."""
+    pattern = re.compile(r'(\[[^\]]+\])(\[[^\]]+\])xfade=transition=\w+:duration=([\d.]+):offset=([-\d.e]+)(\[[^\]]+\])')
+    lengths = {f"[{i}:v]": d for i, d in enumerate(durations)}
+    nodes = {}
+    for f in filters:
+        left, right, td, offset, out = pattern.fullmatch(f).groups()
+        nodes[out] = (left, right, float(offset))
+        lengths[out] = float(offset) + lengths[right]
+
+    root = f"[v{len(durations) - 2}]"
+    starts = []
+    stack = [(root, 0.0)]
+    while stack:
+        label, start = stack.pop()
+        if label in nodes:
+            left, right, offset = nodes[label]
+            starts.append(start + offset)
+            stack.extend([(left, start), (right, start + offset)])
+    return lengths[root], sorted(starts)
+
+
+def test_build_video_filters_tree_matches_flat_chain():
+    """Test that the pairwise xfade tree has the flat chain's timing."""
+    durations = [5.0, 4.2, 6.1, 3.3, 7.0, 4.4, 5.5]
+    td = 1.0
+
+    # Flat left-to-right chain timing
+    flat_starts = []
+    cumulative = durations[0]
+    for d in durations[1:]:
+        flat_starts.append(cumulative - td - 0.05)
+        cumulative += d - td
+    flat_length = flat_starts[-1] + durations[-1]
+
+    filters = build_video_filters(durations, td, transitions=['fade'] * 6)
+    length, starts = _simulate_xfade_graph(filters, durations)
+
+    assert length == pytest.approx(flat_length)
+    assert starts == pytest.approx(flat_starts)
+    assert filters[-1].endswith('[v5]')
+    # Independent first-level merges: the 4th clip is crossfaded with the 3rd directly
+    assert filters[1].startswith('[2:v][3:v]xfade')
+
+
+def test_build_video_filters_tree_keeps_junction_transitions():
+    """Test that each junction keeps its own pre-chosen transition."""
+    filters = build_video_filters(
+        [5.0, 5.0, 5.0, 5.0],
+        transitions=['wipeleft', 'circleopen', 'slideup']
+    )
+
+    assert filters[0].startswith('[0:v][1:v]xfade=transition=wipeleft')
+    assert filters[1].startswith('[2:v][3:v]xfade=transition=slideup')
+    assert filters[2].startswith('[v0][v1]xfade=transition=circleopen')
+
+
+def test_build_audio_filters_flat_afade_mode():
+    """Test that flat crossfade places each clip at its acrossfade start time."""
+    filters = build_audio_filters(
+        num_videos=3,
+        audio_transition_mode='flat_afade',
+        transition_duration=1.0,
+        durations=[5.0, 4.0, 6.0]
+    )
+
+    assert filters[0] == '[0:a]afade=t=out:st=4.0:d=1.0,adelay=delays=0:all=1[af0]'
+    assert filters[1] == (
+        '[1:a]afade=t=in:st=0:d=1.0,afade=t=out:st=3.0:d=1.0,adelay=delays=4000:all=1[af1]'
+    )
+    assert filters[2] == '[2:a]afade=t=in:st=0:d=1.0,adelay=delays=7000:all=1[af2]'
+    assert filters[3] == '[af0][af1][af2]amix=inputs=3:duration=longest:normalize=0[final_audio]'
+
+
+def test_build_audio_filters_flat_afade_needs_durations():
+    """Test that flat crossfade without durations raises error."""
+    with pytest.raises(ValueError, match="one duration per input"):
+        build_audio_filters(num_videos=2, audio_transition_mode='flat_afade')
+
+
+def test_select_audio_mode_static_transition():
+    """Test that a fixed transition switches crossfade to the flat graph."""
+    assert select_audio_mode('crossfade', 'fade', use_random_transitions=False) == 'flat_afade'
+    assert select_audio_mode('crossfade') == 'crossfade'
+    assert select_audio_mode('gap', 'fade', use_random_transitions=False) == 'gap'
+
+
+def test_select_audio_mode_long_sequence():
+    """Test that long crossfade slideshows switch to the flat graph."""
+    many = video_concat.FLAT_AFADE_MIN_INPUTS
+    assert select_audio_mode('crossfade', num_videos=many) == 'flat_afade'
+    assert select_audio_mode('crossfade', num_videos=many - 1) == 'crossfade'
+    assert select_audio_mode('gap', num_videos=many) == 'gap'
+
+
+def test_concatenate_missing_input(tmp_path, touch):
+    """Test that a missing clip is reported before FFmpeg is started."""
+    with pytest.raises(FileNotFoundError, match="pair_002.mp4"):
+        concatenate_videos_with_transitions(
+            video_paths=touch(tmp_path / "pair_001.mp4") + [tmp_path / "pair_002.mp4"],
+            output_path=tmp_path / "final.mp4"
+        )
+
+
+def test_concatenate_clip_shorter_than_transition(monkeypatch, tmp_path, touch):
+    """Test that a clip too short for its transition is rejected by name."""
+    monkeypatch.setattr(video_concat, "run_ffmpeg", lambda cmd: pytest.fail("FFmpeg started"))
+
+    with pytest.raises(ValueError, match="pair_002.mp4 is 1.05s"):
+        concatenate_videos_with_transitions(
+            video_paths=touch(tmp_path / "pair_001.mp4", tmp_path / "pair_002.mp4"),
+            output_path=tmp_path / "final.mp4",
+            transition_duration=1.0,
+            durations=[5.0, 1.05]
+        )
+
+
+def test_get_video_info_parses_ffprobe_bytes(monkeypatch):
+    """Test that raw ffprobe JSON bytes are parsed into per-stream dicts."""
+    import subprocess
+
+    payload = (b'{"streams": [{"codec_type": "video", "codec_name": "h264", "width": 1920},'
+               b' {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000"}]}')
+    monkeypatch.setattr(
+        video_concat.subprocess, "run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout=payload)
+    )
+
+    info = video_concat.get_video_info(Path("clip.mp4"))
+
+    assert info[0]['width'] == 1920
+    assert info[1]['sample_rate'] == '48000'
+
+
+def test_build_video_concat_filter_is_pure():
+    """Test that the graph builder joins video and audio graphs without running anything."""
+    graph, video_label, audio_label = build_video_concat_filter(
+        [5.0, 4.0, 6.0],
+        transitions=['fade', 'wipeleft'],
+        audio_transition_mode='none'
+    )
+
+    expected = build_video_filters(
+        [5.0, 4.0, 6.0], transitions=['fade', 'wipeleft']
+    ) + build_audio_filters(3, audio_transition_mode='none')
+    assert graph == ";".join(expected)
+    assert video_label == '[v1]'
+    assert audio_label == '[final_audio]'
+
+
+def test_build_video_concat_filter_upload_and_cache():
+    """Test the upload label and that repeated identical graphs come from the cache."""
+    video_concat._build_concat_filter_cached.cache_clear()
+    kwargs = dict(transitions=['fade'], upload_filter='format=nv12,hwupload')
+
+    first = build_video_concat_filter([5.0, 4.0], **kwargs)
+    second = build_video_concat_filter([5.0, 4.0], **kwargs)
+
+    assert first == second
+    assert first[1] == '[vout]'
+    assert '[v0]format=nv12,hwupload[vout]' in first[0]
+    assert video_concat._build_concat_filter_cached.cache_info().hits == 1
+
+
+def test_concatenate_batch_splits_cores(monkeypatch, tmp_path):
+    """Test that batch jobs keep their order and share the CPU threads."""
+    calls = []
+
+    def fake_concat(video_paths, output_path, **options):
+        calls.append((output_path, options))
+        return output_path
+
+    monkeypatch.setattr(video_concat, "concatenate_videos_with_transitions", fake_concat)
+    monkeypatch.setattr(video_concat.os, "cpu_count", lambda: 8)
+
+    jobs = [
+        video_concat.ConcatJob([tmp_path / "a1.mp4", tmp_path / "a2.mp4"], tmp_path / "a.mp4"),
+        video_concat.ConcatJob([tmp_path / "b1.mp4", tmp_path / "b2.mp4"], tmp_path / "b.mp4",
+                               options={'threads': 1, 'transition_duration': 0.5}),
+    ]
+
+    assert video_concat.concatenate_batch(jobs) == [tmp_path / "a.mp4", tmp_path / "b.mp4"]
+    options = dict(calls)
+    assert options[tmp_path / "a.mp4"] == {'threads': 4}
+    assert options[tmp_path / "b.mp4"] == {'threads': 1, 'transition_duration': 0.5}
+    assert video_concat.concatenate_batch([]) == []
+
+
+def test_build_audio_filters_stream_copy():
+    """Test that copied audio needs no filters, and only for hard cuts."""
+    assert build_audio_filters(3, audio_transition_mode='none', stream_copy=True) == []
+
+    with pytest.raises(ValueError, match="stream copy"):
+        build_audio_filters(3, audio_transition_mode='gap', stream_copy=True)
+
+
+def test_can_copy_audio(monkeypatch):
+    """Test that audio is copyable only when every first audio stream matches."""
+    streams = {
+        "a.mp3": [{'codec_type': 'audio', 'codec_name': 'mp3', 'sample_rate': '44100', 'channels': 2}],
+        "b.mp3": [{'codec_type': 'video', 'codec_name': 'mjpeg'},
+                  {'codec_type': 'audio', 'codec_name': 'mp3', 'sample_rate': '44100', 'channels': 2}],
+        "c.mp3": [{'codec_type': 'audio', 'codec_name': 'mp3', 'sample_rate': '48000', 'channels': 2}],
+        "d.wav": [{'codec_type': 'audio', 'codec_name': 'pcm_s16le', 'sample_rate': '44100', 'channels': 2}],
+        "e.mp4": [{'codec_type': 'video', 'codec_name': 'h264'}],
+    }
+    monkeypatch.setattr(video_concat, "get_video_info", lambda path: streams[path.name])
+
+    assert video_concat.can_copy_audio([Path("a.mp3"), Path("b.mp3")])
+    assert not video_concat.can_copy_audio([Path("a.mp3"), Path("c.mp3")])
+    assert not video_concat.can_copy_audio([Path("d.wav"), Path("d.wav")])
+    assert not video_concat.can_copy_audio([Path("a.mp3"), Path("e.mp4")])
+
+
+def test_concatenate_copies_matching_audio(monkeypatch, tmp_path, record_ffmpeg, touch):
+    """Test that hard audio cuts over matching streams copy the audio."""
+    commands, graphs = [], []
+    lists = []
+
+    def run(cmd):
+        record_ffmpeg(commands, graphs)(cmd)
+        list_path = Path(cmd[cmd.index('concat') + 4])
+        lists.append((list_path, list_path.read_text()))
+
+    monkeypatch.setattr(video_concat, "run_ffmpeg", run)
+    monkeypatch.setattr(video_concat, "can_copy_audio", lambda paths: True)
+
+    audio = touch(tmp_path / "audio_001.mp3", tmp_path / "audio_002.mp3")
+    concatenate_videos_with_transitions(
+        video_paths=touch(tmp_path / "pair_001.mov", tmp_path / "pair_002.mov"),
+        output_path=tmp_path / "final.mp4",
+        audio_transition_mode='none',
+        encoder='libx264',
+        transitions=['fade'],
+        audio_paths=audio,
+        durations=[5.0, 4.0],
+        temp_dir=tmp_path
+    )
+
+    cmd = commands[0]
+    assert cmd.count('-i') == 3
+    assert cmd[cmd.index('-c:a') + 1] == 'copy'
+    maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-map']
+    assert maps == ['[v0]', '2:a:0']
+    assert ':a]' not in graphs[0]
+    list_path, entries = lists[0]
+    assert entries.splitlines() == [f"file 'file:{path.resolve()}'" for path in audio]
+    assert not list_path.exists()
+
+
+def test_concatenate_batch_cancels_queued_jobs_on_failure(monkeypatch, tmp_path):
+    """Test that the first failure is raised and jobs not yet started never run."""
+    started = []
+
+    def fake_concat(video_paths, output_path, **options):
+        started.append(output_path.name)
+        if output_path.name == "a.mp4":
+            raise ValueError("bad clip")
+        return output_path
+
+    monkeypatch.setattr(video_concat, "concatenate_videos_with_transitions", fake_concat)
+
+    jobs = [
+        video_concat.ConcatJob([tmp_path / "1.mp4", tmp_path / "2.mp4"], tmp_path / name)
+        for name in ("a.mp4", "b.mp4", "c.mp4")
+    ]
+
+    with pytest.raises(ValueError, match="bad clip"):
+        video_concat.concatenate_batch(jobs, max_workers=1)
+    assert started == ["a.mp4"]
+
+
+def test_get_video_info_probes_each_file_once(monkeypatch, tmp_path):
+    """Test that repeated stream checks reuse one ffprobe run per unchanged file."""
+    import subprocess
+
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[-1])
+        return subprocess.CompletedProcess(
+            cmd, 0, stdout=b'{"streams": [{"codec_type": "audio", "codec_name": "aac",'
+                           b' "sample_rate": "48000", "channels": 2}]}'
+        )
+
+    monkeypatch.setattr(video_concat.subprocess, "run", fake_run)
+    video_concat._cached_video_info.cache_clear()
+    clip = tmp_path / "pair_001.mp4"
+    clip.write_bytes(b"clip")
+
+    assert video_concat.can_stream_copy([clip, clip])
+    assert video_concat.can_copy_audio([clip, clip])
+    assert len(calls) == 1
+
+    video_concat.get_video_info(clip)[0]['codec_name'] = 'changed'
+    assert video_concat.get_video_info(clip)[0]['codec_name'] == 'aac'
+
+    clip.write_bytes(b"re-encoded clip")
+    video_concat.get_video_info(clip)
+    assert len(calls) == 2